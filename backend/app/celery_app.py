@@ -9,6 +9,13 @@ load_dotenv()
 BROKER_URL = os.getenv("RABBITMQ_URL")
 BACKEND_URL = os.getenv("REDIS_URL")
 
+# Pipeline stage queues: CPU-bound stages (rasterize/detect/encode, audio
+# encode) and I/O-bound stages (uploads, Groq, TTS) scale independently:
+#   celery -A app.celery_app worker -Q pipeline.cpu --concurrency=<cores>
+#   celery -A app.celery_app worker -Q pipeline.io  --concurrency=8
+CPU_QUEUE = os.getenv("CPU_QUEUE", "pipeline.cpu")
+IO_QUEUE = os.getenv("IO_QUEUE", "pipeline.io")
+
 # 2. Initialize Celery
 celery_app = Celery(
     "manhwa_worker",
@@ -27,5 +34,12 @@ celery_app.conf.update(
     result_expires=3600,            # Keep results for 1 hour
     worker_prefetch_multiplier=1,   # Process 1 task at a time (Heavy AI work)
     task_acks_late=True,
-    broker_connection_retry_on_startup=True
+    broker_connection_retry_on_startup=True,
+    task_routes={
+        "pipeline.extract": {"queue": CPU_QUEUE},
+        "pipeline.upload_panels": {"queue": IO_QUEUE},
+        "pipeline.script": {"queue": IO_QUEUE},
+        "pipeline.narrate": {"queue": IO_QUEUE},
+        "pipeline.assemble": {"queue": CPU_QUEUE},
+    },
 )
\ No newline at end of file
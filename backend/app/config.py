@@ -23,10 +23,14 @@ else:
 # Define paths
 TTS_CACHE_DIR = os.path.join(BASE_DIR, "tts_cache")
 TEMP_DIR = os.path.join(BASE_DIR, "temp")
+# Per-job hand-off between pipeline stages — must be a shared volume when
+# the CPU and I/O workers run on different machines
+ARTIFACT_DIR = os.getenv("ARTIFACT_DIR", os.path.join(BASE_DIR, "artifacts"))
 
 # Create directories immediately
 os.makedirs(TTS_CACHE_DIR, exist_ok=True)
 os.makedirs(TEMP_DIR, exist_ok=True)
+os.makedirs(ARTIFACT_DIR, exist_ok=True)
 
 # -----------------------------
 # 2. GOOGLE/GROQ API KEY
@@ -1,15 +1,27 @@
 import os
+import json
 import random
 import asyncio
-from fastapi import FastAPI, Form, UploadFile, File, HTTPException
+import secrets
+from fastapi import FastAPI, Form, UploadFile, File, HTTPException, Header, Depends
+from fastapi.responses import StreamingResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
-from celery.result import AsyncResult
 
 # Import Celery stuff
 from app.celery_app import celery_app
-from app.worker import process_manga_pdf_task
+from app.worker import enqueue_manga_job
 
-from app.utils.supabase_utils import supabase_upload
+from app.utils.supabase_utils import supabase_upload_file
+from app.utils.upload_utils import spool_upload
+from app.utils.cache_utils import result_cache_stats, invalidate_result_cache
+from app.utils.llm_cache_utils import llm_cache_stats
+from app.utils.tts_cache_utils import tts_cache_stats
+from app.utils.events_utils import (
+    TERMINAL_STATES, subscribe_job_events, aget_job_state, redis_client as events_redis
+)
+from app.utils.status_utils import lookup_status, require_job
+from app.utils.job_store_utils import write_job_status
+from app.utils.metrics_utils import metrics_payload
 from supabase import create_client
 
 app = FastAPI()
@@ -25,6 +37,16 @@ SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
 supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
 
+# Admin endpoints (cache stats / invalidation) need `X-Admin-Token: <ADMIN_TOKEN>`;
+# with ADMIN_TOKEN unset they are disabled
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+
+def require_admin(x_admin_token: str = Header(None)):
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=503, detail="Admin endpoints disabled (ADMIN_TOKEN not set)")
+    if not x_admin_token or not secrets.compare_digest(x_admin_token, ADMIN_TOKEN):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
 @app.get("/")
 def home():
     return {"status": "Manhwa AI Running on Hugging Face (RabbitMQ + Redis)"}
@@ -39,10 +61,12 @@ async def start_generation(
         # 1. Generate ID (Using your existing method)
         task_id = str(random.getrandbits(63))
         
-        # 2. Upload PDF
-        file_bytes = await manga_pdf.read()
+        # 2. Upload PDF (⚡ streamed in chunks → disk → storage, never fully in RAM)
+        spooled = await spool_upload(manga_pdf)
         unique_filename = f"uploads/{task_id}_{manga_name[:10].replace(' ', '_')}.pdf"
-        pdf_url = supabase_upload(file_bytes, unique_filename, "application/pdf")
+        pdf_url = await asyncio.to_thread(
+            supabase_upload_file, spooled.path, unique_filename, "application/pdf"
+        )
 
         # 3. Create DB Entry (Status: QUEUED)
         supabase.table("jobs").insert({
@@ -52,33 +76,79 @@ async def start_generation(
             "pdf_url": pdf_url,
             "created_at": "now()"
         }).execute()
+        write_job_status(task_id, {"job_id": task_id, "status": "QUEUED", "manga_name": manga_name})
 
-        # 4. ⚡ Dispatch to RabbitMQ (Optimization)
-        process_manga_pdf_task.apply_async(
-            args=[task_id, manga_name, manga_genre, pdf_url],
-            task_id=task_id
-        )
+        # 4. ⚡ Dispatch to RabbitMQ (stage chain on the CPU / I/O queues)
+        enqueue_manga_job(task_id, manga_name, manga_genre, pdf_url, pdf_sha256=spooled.sha256)
 
-        return {"task_id": task_id, "status": "QUEUED"}
+        return {"task_id": task_id, "status": "QUEUED", "page_count": spooled.page_count}
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/v1/status/{task_id}")
-def get_status(task_id: str):
-    # Optimization: Check Redis first for active status
-    task_result = AsyncResult(task_id, app=celery_app)
-    
-    if task_result.state in ['PENDING', 'STARTED', 'RETRY']:
-        return {"task_id": task_id, "state": "PROCESSING", "progress": "Working..."}
-    
-    # Fallback to Supabase for final result
-    res = supabase.table("jobs").select("*").eq("id", task_id).execute()
-    if not res.data: raise HTTPException(404, "Task not found")
-    rec = res.data[0]
-    
-    return {
-        "task_id": str(rec["id"]),
-        "state": rec["status"],
-        "result": rec.get("result_url")
-    }
\ No newline at end of file
+async def get_status(task_id: str):
+    """
+    Polling endpoint (kept for clients without SSE).
+    ⚡ Async + cached: finished jobs are answered from memory/Redis, progress
+    comes from the worker's last published state, and concurrent polls for
+    one task share a single lookup (see status_utils).
+    """
+    return await lookup_status(task_id)
+
+# -------------------------------------------------------------
+# Prometheus metrics (API + worker processes in multiprocess mode)
+# -------------------------------------------------------------
+@app.get("/metrics")
+def metrics():
+    body, content_type = metrics_payload()
+    return Response(content=body, media_type=content_type)
+
+# -------------------------------------------------------------
+# Result cache admin (re-uploaded chapters skip the pipeline)
+# -------------------------------------------------------------
+@app.get("/api/v1/cache/stats", dependencies=[Depends(require_admin)])
+def cache_stats():
+    # NOTE: llm/tts caches are per-container disk — these are the API container's numbers
+    return {"results": result_cache_stats(), "llm": llm_cache_stats(), "tts": tts_cache_stats()}
+
+@app.post("/api/v1/cache/invalidate", dependencies=[Depends(require_admin)])
+def cache_invalidate(pdf_sha256: str = Form(None)):
+    """No hash → invalidate every cached result (e.g. after a prompt/model change)."""
+    removed = invalidate_result_cache(pdf_sha256)
+    return {"invalidated": pdf_sha256 or "all", "result": removed}
+
+# -------------------------------------------------------------
+# Push-based status (SSE over Redis pub/sub)
+# -------------------------------------------------------------
+@app.get("/api/v1/status/{task_id}/stream")
+async def stream_status(task_id: str):
+    """
+    Server-Sent Events: the last known state on connect, then every
+    stage/progress event the worker publishes, closing after SUCCESS/FAILED
+    (or STREAM_MAX_IDLE seconds without an event).
+    """
+    if events_redis is None:
+        raise HTTPException(503, "Status streaming unavailable (no Redis)")
+
+    # No published state yet (queued / finished before streaming existed) → one poll.
+    # Unknown ids come back as "queued" from Celery, so a non-terminal answer
+    # is confirmed against the jobs row — 404 before streaming, not an endless stream
+    initial = None
+    if await aget_job_state(task_id) is None:
+        initial = await lookup_status(task_id)
+        if initial.get("state") not in TERMINAL_STATES:
+            await require_job(task_id)
+
+    async def _events():
+        async for event in subscribe_job_events(task_id, initial_state=initial):
+            if event is None:
+                yield ": ping\n\n"  # heartbeat keeps proxies from closing the stream
+            else:
+                yield f"event: status\ndata: {json.dumps(event)}\n\n"
+
+    return StreamingResponse(
+        _events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
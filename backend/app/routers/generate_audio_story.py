@@ -1,9 +1,11 @@
 import json
 import os
+import asyncio
 import boto3
 import random
 from fastapi import APIRouter, Form, UploadFile, File, HTTPException
-from ..utils.supabase_utils import supabase_upload 
+from ..utils.supabase_utils import supabase_upload_file
+from ..utils.upload_utils import spool_upload
 from supabase import create_client
 
 router = APIRouter()
@@ -36,12 +38,14 @@ async def start_generation(
         task_id = random.getrandbits(63)
         print(f"🆔 Generated Task ID (Int): {task_id}")
 
-        # B. Upload PDF
-        file_bytes = await manga_pdf.read()
+        # B. Upload PDF (streamed in chunks, never fully in memory)
+        spooled = await spool_upload(manga_pdf)
         # Use str(task_id) for filename to be safe
         unique_filename = f"uploads/{str(task_id)}_{manga_name[:10].replace(' ', '_')}.pdf"
         
-        pdf_url = supabase_upload(file_bytes, unique_filename, "application/pdf")
+        pdf_url = await asyncio.to_thread(
+            supabase_upload_file, spooled.path, unique_filename, "application/pdf"
+        )
 
         # C. Create Database Entry
         new_job_data = {
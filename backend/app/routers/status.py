@@ -1,9 +1,10 @@
 # backend/app/routers/status.py
 
-import os
 import time
-import json
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
+from ..utils.job_store_utils import (
+    read_job_status, list_job_statuses, count_job_statuses, JOB_LIST_MAX
+)
 
 router = APIRouter()
 
@@ -27,49 +28,15 @@ def health():
 # JOB STATUS SYSTEM
 # ----------------------------------------------------------
 
-# Correct base directory for backend/job_status
-BASE_DIR = os.path.abspath(
-    os.path.join(os.path.dirname(__file__), "../../")
-)
-
-STATUS_DIR = os.path.join(BASE_DIR, "job_status")
-os.makedirs(STATUS_DIR, exist_ok=True)
-
-
-def status_path(job_id: str):
-    """Full path to job status JSON file."""
-    return os.path.join(STATUS_DIR, f"{job_id}.json")
-
-
+# ⚡ Indexed store (SQLite) instead of one JSON file per job
 def read_status(job_id: str):
-    """Read status JSON safely."""
-    path = status_path(job_id)
-
-    if not os.path.exists(path):
-        return None
-
+    """Read status safely (primary-key lookup)."""
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)
+        return read_job_status(job_id)
     except Exception:
         return None
 
 
-def list_all_jobs():
-    jobs = []
-    for filename in os.listdir(STATUS_DIR):
-        if filename.endswith(".json"):
-            try:
-                with open(os.path.join(STATUS_DIR, filename), "r", encoding="utf-8") as f:
-                    jobs.append(json.load(f))
-            except:
-                continue
-
-    # Sort newest first
-    jobs = sorted(jobs, key=lambda x: x.get("_updated_at", 0), reverse=True)
-    return jobs
-
-
 # ----------------------------------------------------------
 # API ROUTES
 # ----------------------------------------------------------
@@ -98,12 +65,22 @@ def get_job_status(job_id: str):
 
 
 @router.get("/status/jobs")
-def get_all_jobs():
+def get_all_jobs(
+    limit: int = Query(50, ge=1, le=JOB_LIST_MAX),
+    cursor: str = None,
+    status: str = None
+):
     """
-    List all jobs (for debugging and admin UI).
+    List jobs newest first (for debugging and admin UI).
+    Pass `next_cursor` back as `cursor` for the next page; `status` filters.
     """
-    jobs = list_all_jobs()
+    try:
+        jobs, next_cursor = list_job_statuses(limit=limit, cursor=cursor, status=status)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
     return {
-        "count": len(jobs),
-        "jobs": jobs
+        "count": count_job_statuses(status),
+        "jobs": jobs,
+        "next_cursor": next_cursor
     }
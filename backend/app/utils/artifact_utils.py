@@ -0,0 +1,102 @@
+# backend/app/utils/artifact_utils.py
+"""
+Per-job artifacts (pipeline stage hand-off)
+-------------------------------------------
+Stages pass each other references, not bytes: panel JPEGs, the script,
+TTS clips and the progress snapshot live in ARTIFACT_DIR/<task_id>/ and
+only the small job dict (ids, panel mapping, paths, URLs) goes through
+the broker.
+
+ARTIFACT_DIR must be a shared volume when the CPU and I/O workers run on
+different machines. Directories of jobs that died mid-pipeline are swept
+after ARTIFACT_TTL seconds.
+"""
+
+import os
+import json
+import time
+import uuid
+import shutil
+from app.config import ARTIFACT_DIR
+
+ARTIFACT_TTL = int(os.getenv("ARTIFACT_TTL", 24 * 3600))
+
+
+def job_dir(task_id, *parts) -> str:
+    path = os.path.join(ARTIFACT_DIR, str(task_id), *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def _atomic_write(path: str, data: bytes):
+    tmp = f"{path}.{uuid.uuid4().hex}.part"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+# -------------------------------------------------------------
+# Write / read
+# -------------------------------------------------------------
+def write_artifact(task_id, name: str, data: bytes) -> str:
+    """Stores bytes under the job's directory; returns the reference (path)."""
+    path = os.path.join(job_dir(task_id, os.path.dirname(name)), os.path.basename(name))
+    _atomic_write(path, data)
+    return path
+
+
+def read_artifact(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def write_json_artifact(task_id, name: str, obj) -> str:
+    return write_artifact(task_id, name, json.dumps(obj).encode())
+
+
+def read_json_artifact(path: str, default=None):
+    if not os.path.exists(path):
+        return default
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def adopt_file(task_id, name: str, src: str) -> str:
+    """
+    Brings a file produced outside the job directory (e.g. a cached TTS
+    clip) into it: hard link when on the same filesystem, else a copy.
+    """
+    dest = os.path.join(job_dir(task_id, os.path.dirname(name)), os.path.basename(name))
+    if not os.path.exists(dest):
+        try:
+            os.link(src, dest)
+        except OSError:
+            tmp = f"{dest}.{uuid.uuid4().hex}.part"
+            shutil.copyfile(src, tmp)
+            os.replace(tmp, dest)
+    return dest
+
+
+# -------------------------------------------------------------
+# Cleanup
+# -------------------------------------------------------------
+def remove_job_artifacts(task_id):
+    shutil.rmtree(os.path.join(ARTIFACT_DIR, str(task_id)), ignore_errors=True)
+
+
+def sweep_stale_artifacts():
+    """Removes job directories untouched for ARTIFACT_TTL (crashed/abandoned jobs)."""
+    if not os.path.isdir(ARTIFACT_DIR):
+        return
+    cutoff = time.time() - ARTIFACT_TTL
+    removed = 0
+    for name in os.listdir(ARTIFACT_DIR):
+        path = os.path.join(ARTIFACT_DIR, name)
+        try:
+            if os.path.isdir(path) and os.path.getmtime(path) < cutoff:
+                shutil.rmtree(path, ignore_errors=True)
+                removed += 1
+        except OSError:
+            continue
+    if removed:
+        print(f"🧹 Removed {removed} stale artifact directories")
@@ -0,0 +1,82 @@
+# backend/app/utils/audio_utils.py
+"""
+Linear-time narration assembly (FFmpeg concat demuxer)
+------------------------------------------------------
+The cached TTS clips are concatenated by one ffmpeg process that decodes
+each clip once and encodes the final track once, straight to a file on
+disk. Nothing is decoded into Python memory, and the result is streamed
+to storage from that file.
+"""
+
+import os
+import uuid
+import asyncio
+from app.config import TEMP_DIR, TTS_CACHE_DIR
+
+# -------------------------------------------------------------
+# CONFIGURATION
+# -------------------------------------------------------------
+AUDIO_SAMPLE_RATE = int(os.getenv("AUDIO_SAMPLE_RATE", 24000))  # Edge-TTS native rate
+AUDIO_BITRATE = os.getenv("AUDIO_BITRATE", "64k")
+
+
+async def _ffmpeg(*args: str):
+    proc = await asyncio.create_subprocess_exec(
+        "ffmpeg", "-hide_banner", "-loglevel", "error", "-y", *args,
+        stdout=asyncio.subprocess.DEVNULL,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    _, err = await proc.communicate()
+    if proc.returncode != 0:
+        raise RuntimeError(f"❌ ffmpeg failed: {err.decode(errors='ignore').strip()}")
+
+
+async def silence_clip(seconds: float) -> str:
+    """Cached silent MP3 of the given length (used for scenes without narration)."""
+    ms = int(round(seconds * 1000))
+    path = os.path.join(TTS_CACHE_DIR, f"silence_{ms}ms_{AUDIO_SAMPLE_RATE}.mp3")
+    if not os.path.exists(path):
+        tmp = f"{path}.{uuid.uuid4().hex}.part.mp3"
+        await _ffmpeg(
+            "-f", "lavfi", "-i", f"anullsrc=r={AUDIO_SAMPLE_RATE}:cl=mono",
+            "-t", f"{ms / 1000:.3f}", "-c:a", "libmp3lame", "-b:a", AUDIO_BITRATE, tmp
+        )
+        os.replace(tmp, path)
+    return path
+
+
+def _concat_line(path: str) -> str:
+    # concat demuxer syntax: single-quoted, with ' escaped as '\''
+    escaped = os.path.abspath(path).replace("'", "'\\''")
+    return f"file '{escaped}'\n"
+
+
+# -------------------------------------------------------------
+# MAIN
+# -------------------------------------------------------------
+async def assemble_narration(clips: list) -> str:
+    """
+    clips = [(mp3_path or None, seconds)] in timeline order; None → silence.
+    Returns the path of the encoded MP3 (caller uploads and deletes it).
+    """
+    os.makedirs(TEMP_DIR, exist_ok=True)
+    job = uuid.uuid4().hex
+    list_path = os.path.join(TEMP_DIR, f"concat_{job}.txt")
+    out_path = os.path.join(TEMP_DIR, f"narration_{job}.mp3")
+
+    with open(list_path, "w", encoding="utf-8") as f:
+        for path, seconds in clips:
+            f.write(_concat_line(path or await silence_clip(seconds)))
+
+    try:
+        await _ffmpeg(
+            "-f", "concat", "-safe", "0", "-i", list_path,
+            "-ar", str(AUDIO_SAMPLE_RATE), "-ac", "1",
+            "-c:a", "libmp3lame", "-b:a", AUDIO_BITRATE,
+            out_path
+        )
+    finally:
+        os.remove(list_path)
+
+    print(f"✔ Narration assembled → {len(clips)} clips, {os.path.getsize(out_path) / 1e6:.2f} MB")
+    return out_path
@@ -0,0 +1,135 @@
+# backend/app/utils/cache_utils.py
+"""
+Content-addressed job result cache (Redis)
+------------------------------------------
+Key  = PDF SHA-256 + every setting that changes the output
+       (genre, voice, DPI, model, prompt version, segmenter ...)
+Value = pointers to an already finished job (result.json, images, audio)
+
+Invalidation:
+ - automatic : bump PROMPT_VERSION / model / voice → new keys, old ones miss
+ - manual    : invalidate_result_cache() bumps a generation counter (all
+               entries), invalidate_result_cache(pdf_sha256) drops one PDF
+"""
+
+import os
+import json
+import hashlib
+import redis
+
+# -------------------------------------------------------------
+# CONFIGURATION
+# -------------------------------------------------------------
+REDIS_URL = os.getenv("REDIS_URL")
+RESULT_CACHE_ENABLED = os.getenv("RESULT_CACHE_ENABLED", "true").lower() == "true"
+RESULT_CACHE_TTL = int(os.getenv("RESULT_CACHE_TTL", 30 * 24 * 3600))  # 30 days
+
+_PREFIX = "manhwa:result_cache"
+_GENERATION_KEY = f"{_PREFIX}:generation"
+_HITS_KEY = f"{_PREFIX}:hits"
+_MISSES_KEY = f"{_PREFIX}:misses"
+
+# -------------------------------------------------------------
+# Client (shared with the Celery result backend's Redis)
+# -------------------------------------------------------------
+redis_client = None
+if REDIS_URL and RESULT_CACHE_ENABLED:
+    try:
+        redis_client = redis.Redis.from_url(REDIS_URL, decode_responses=True, socket_timeout=5)
+    except Exception as e:
+        print(f"⚠ Result cache disabled (Redis unavailable): {e}")
+
+
+def _settings_hash(settings: dict) -> str:
+    raw = json.dumps(settings, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(raw.encode()).hexdigest()[:16]
+
+
+def _generation() -> int:
+    return int(redis_client.get(_GENERATION_KEY) or 0)
+
+
+def _entry_key(pdf_sha256: str, settings: dict) -> str:
+    return f"{_PREFIX}:{_generation()}:{pdf_sha256}:{_settings_hash(settings)}"
+
+
+# -------------------------------------------------------------
+# Lookup / store
+# -------------------------------------------------------------
+def get_cached_result(pdf_sha256: str, settings: dict):
+    """
+    Returns the cached result pointers, or None on a miss. Not counted:
+    the caller validates the entry first, then calls count_result_lookup().
+    """
+    if redis_client is None or not pdf_sha256:
+        return None
+    try:
+        raw = redis_client.get(_entry_key(pdf_sha256, settings))
+        return json.loads(raw) if raw else None
+    except Exception as e:
+        print(f"⚠ Result cache lookup failed: {e}")
+        return None
+
+
+def count_result_lookup(hit: bool):
+    """Hit/miss counters behind result_cache_stats (dead entries count as misses)."""
+    if redis_client is None:
+        return
+    try:
+        redis_client.incr(_HITS_KEY if hit else _MISSES_KEY)
+    except Exception as e:
+        print(f"⚠ Result cache counter failed: {e}")
+
+
+def store_cached_result(pdf_sha256: str, settings: dict, result: dict):
+    if redis_client is None or not pdf_sha256:
+        return
+    try:
+        redis_client.set(_entry_key(pdf_sha256, settings), json.dumps(result), ex=RESULT_CACHE_TTL)
+    except Exception as e:
+        print(f"⚠ Result cache store failed: {e}")
+
+
+def drop_cached_result(pdf_sha256: str, settings: dict):
+    """Removes one entry (e.g. its result.json no longer exists)."""
+    if redis_client is None:
+        return
+    try:
+        redis_client.delete(_entry_key(pdf_sha256, settings))
+    except Exception as e:
+        print(f"⚠ Result cache delete failed: {e}")
+
+
+# -------------------------------------------------------------
+# Invalidation + metrics
+# -------------------------------------------------------------
+def invalidate_result_cache(pdf_sha256: str = None) -> int:
+    """
+    No argument → every cached result misses from now on (generation bump).
+    With a hash → only that PDF's entries are removed.
+    Returns the number of deleted keys (or the new generation).
+    """
+    if redis_client is None:
+        return 0
+    if pdf_sha256 is None:
+        generation = redis_client.incr(_GENERATION_KEY)
+        print(f"🧹 Result cache invalidated → generation {generation}")
+        return generation
+
+    keys = list(redis_client.scan_iter(f"{_PREFIX}:{_generation()}:{pdf_sha256}:*"))
+    return redis_client.delete(*keys) if keys else 0
+
+
+def result_cache_stats() -> dict:
+    if redis_client is None:
+        return {"enabled": False}
+    hits = int(redis_client.get(_HITS_KEY) or 0)
+    misses = int(redis_client.get(_MISSES_KEY) or 0)
+    total = hits + misses
+    return {
+        "enabled": True,
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": round(hits / total, 3) if total else 0.0,
+        "generation": _generation(),
+    }
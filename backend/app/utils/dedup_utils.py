@@ -0,0 +1,87 @@
+# backend/app/utils/dedup_utils.py
+"""
+Perceptual-hash panel deduplication
+-----------------------------------
+Scans repeat panels, credit pages and near-identical frames. Each panel
+gets a 64-bit dHash; panels within PANEL_DEDUP_DISTANCE bits (Hamming)
+of an earlier panel — and with a similar aspect ratio — collapse onto it,
+so they share its JPEG, upload, vision description and TTS clip.
+"""
+
+import os
+import numpy as np
+from typing import List
+from PIL import Image
+
+# Max differing bits (of 64) to count as a duplicate; negative disables dedup
+PANEL_DEDUP_DISTANCE = int(os.getenv("PANEL_DEDUP_DISTANCE", 4))
+_MAX_ASPECT_DRIFT = 0.15  # duplicate panels must have ~the same shape
+
+_HASH_SIZE = 8
+
+
+# ----------------------------------------------------------
+# 1. Vectorized dHash
+# ----------------------------------------------------------
+def dhash_panels(images: List[Image.Image]) -> np.ndarray:
+    """
+    Returns one uint64 difference hash per image.
+    Only the 9x8 thumbnails are built per image; the gradient
+    comparison and bit packing run on the whole stack at once.
+    """
+    if not images:
+        return np.zeros(0, dtype=np.uint64)
+
+    thumbs = np.stack([
+        np.asarray(img.convert("L").resize((_HASH_SIZE + 1, _HASH_SIZE), Image.BILINEAR), dtype=np.int16)
+        for img in images
+    ])                                                   # (N, 8, 9)
+    bits = thumbs[:, :, 1:] > thumbs[:, :, :-1]          # (N, 8, 8)
+    packed = np.packbits(bits.reshape(len(images), -1), axis=1)  # (N, 8) uint8
+    return packed.view(">u8").ravel().astype(np.uint64)
+
+
+def _popcount(x: np.ndarray) -> np.ndarray:
+    if hasattr(np, "bitwise_count"):  # NumPy >= 2.0
+        return np.bitwise_count(x)
+    as_bytes = x.view(np.uint8).reshape(*x.shape, 8)
+    return np.unpackbits(as_bytes, axis=-1).sum(axis=-1)
+
+
+def hamming_matrix(hashes: np.ndarray) -> np.ndarray:
+    """(N, N) pairwise Hamming distances between uint64 hashes."""
+    return _popcount(hashes[:, None] ^ hashes[None, :]).astype(np.int16)
+
+
+# ----------------------------------------------------------
+# 2. Collapse near-duplicates
+# ----------------------------------------------------------
+def dedupe_panels(images: List[Image.Image], max_distance: int = None) -> List[int]:
+    """
+    Returns canonical[i] = index of the first panel that panel i duplicates
+    (canonical[i] == i for unique panels). Order is preserved, so the
+    canonical panel is always the earliest occurrence.
+    """
+    max_distance = PANEL_DEDUP_DISTANCE if max_distance is None else max_distance
+    n = len(images)
+    if n < 2 or max_distance < 0:
+        return list(range(n))
+
+    dist = hamming_matrix(dhash_panels(images))
+    aspect = np.array([img.width / max(img.height, 1) for img in images])
+    same_shape = np.abs(aspect[:, None] / aspect[None, :] - 1.0) <= _MAX_ASPECT_DRIFT
+    similar = (dist <= max_distance) & same_shape
+
+    canonical = list(range(n))
+    is_canonical = np.ones(n, dtype=bool)
+    for i in range(1, n):
+        # earliest canonical panel before i that i matches
+        candidates = np.flatnonzero(similar[i, :i] & is_canonical[:i])
+        if candidates.size:
+            canonical[i] = int(candidates[0])
+            is_canonical[i] = False
+
+    unique = int(is_canonical.sum())
+    if unique < n:
+        print(f"🧬 Dedup: {n} panels → {unique} unique (max distance {max_distance})")
+    return canonical
@@ -0,0 +1,96 @@
+# backend/app/utils/download_utils.py
+
+import os
+import uuid
+import shutil
+import hashlib
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from app.config import TEMP_DIR
+from app.utils.upload_utils import local_upload_path
+
+# -------------------------------------------------------------
+# CONFIGURATION
+# -------------------------------------------------------------
+DOWNLOAD_CHUNK_SIZE = int(os.getenv("DOWNLOAD_CHUNK_SIZE", 1024 * 1024))  # 1 MB
+DOWNLOAD_CONNECT_TIMEOUT = float(os.getenv("DOWNLOAD_CONNECT_TIMEOUT", 10))
+DOWNLOAD_READ_TIMEOUT = float(os.getenv("DOWNLOAD_READ_TIMEOUT", 60))
+
+# -------------------------------------------------------------
+# Pooled session (reused across tasks in the same worker process)
+# -------------------------------------------------------------
+_retry = Retry(
+    total=3,
+    backoff_factor=1.0,
+    status_forcelist=(429, 500, 502, 503, 504),
+    allowed_methods=frozenset(["GET", "HEAD"]),
+)
+_adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=_retry)
+
+http_session = requests.Session()
+http_session.mount("https://", _adapter)
+http_session.mount("http://", _adapter)
+
+
+def _hash_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(DOWNLOAD_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# -------------------------------------------------------------
+# MAIN: stream PDF → disk, with local content-hash short-circuit
+# -------------------------------------------------------------
+def download_pdf(pdf_url: str, expected_sha256: str = None) -> tuple[str, str]:
+    """
+    Returns (local_path, sha256).
+
+    If the API spooled the same bytes into this container (shared /tmp on
+    HF Spaces), the local copy is reused and the network fetch is skipped.
+    Otherwise the PDF is streamed to disk in chunks and hashed on the fly.
+    """
+    dest = os.path.join(TEMP_DIR, f"{uuid.uuid4()}.pdf")
+
+    # ⚡ SHORT-CIRCUIT: same content already on local disk
+    if expected_sha256:
+        local = local_upload_path(expected_sha256)
+        if os.path.exists(local) and _hash_file(local) == expected_sha256:
+            try:
+                os.link(local, dest)  # same filesystem → no byte copy
+            except OSError:
+                shutil.copyfile(local, dest)
+            print(f"⚡ Using local PDF copy (sha256 {expected_sha256[:12]}) — skipped download")
+            return dest, expected_sha256
+
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with http_session.get(
+            pdf_url,
+            stream=True,
+            timeout=(DOWNLOAD_CONNECT_TIMEOUT, DOWNLOAD_READ_TIMEOUT),
+        ) as resp:
+            if resp.status_code != 200:
+                raise ValueError(f"Failed to download PDF (HTTP {resp.status_code})")
+
+            with open(dest, "wb") as f:
+                for chunk in resp.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                    if not chunk:
+                        continue
+                    f.write(chunk)
+                    digest.update(chunk)
+                    size += len(chunk)
+    except Exception:
+        if os.path.exists(dest):
+            os.remove(dest)
+        raise
+
+    sha256 = digest.hexdigest()
+    if expected_sha256 and sha256 != expected_sha256:
+        print(f"⚠ Downloaded PDF hash {sha256[:12]} != expected {expected_sha256[:12]}")
+
+    print(f"✔ Downloaded PDF → {size / 1e6:.1f} MB | sha256 {sha256[:12]}")
+    return dest, sha256
@@ -0,0 +1,103 @@
+# backend/app/utils/encode_utils.py
+"""
+Parallel JPEG encoding
+----------------------
+Pillow and OpenCV both release the GIL inside the JPEG encoder, so a
+thread pool scales across cores without pickling panels to processes.
+Encoder, quality, optimize and progressive are configurable so size can
+be traded for speed; per-panel bytes/ms are reported.
+"""
+
+import io
+import os
+import time
+import cv2
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple
+from PIL import Image
+from app.utils.pdf_utils import available_cpus
+
+# -------------------------------------------------------------
+# CONFIGURATION
+# -------------------------------------------------------------
+JPEG_ENCODER = os.getenv("JPEG_ENCODER", "pillow").lower()   # "pillow" | "opencv"
+JPEG_QUALITY = int(os.getenv("JPEG_QUALITY", 75))
+JPEG_OPTIMIZE = os.getenv("JPEG_OPTIMIZE", "true").lower() == "true"
+JPEG_PROGRESSIVE = os.getenv("JPEG_PROGRESSIVE", "false").lower() == "true"
+ENCODE_WORKERS = int(os.getenv("ENCODE_WORKERS", 0))  # 0 = container CPU count
+
+
+# -------------------------------------------------------------
+# Encoders
+# -------------------------------------------------------------
+def _encode_pillow(img: Image.Image, quality: int, optimize: bool, progressive: bool) -> bytes:
+    buf = io.BytesIO()
+    img.convert("RGB").save(
+        buf, format="JPEG", quality=quality, optimize=optimize, progressive=progressive
+    )
+    return buf.getvalue()
+
+
+def _encode_opencv(img: Image.Image, quality: int, optimize: bool, progressive: bool) -> bytes:
+    bgr = cv2.cvtColor(np.asarray(img.convert("RGB")), cv2.COLOR_RGB2BGR)
+    ok, out = cv2.imencode(".jpg", bgr, [
+        cv2.IMWRITE_JPEG_QUALITY, quality,
+        cv2.IMWRITE_JPEG_OPTIMIZE, int(optimize),
+        cv2.IMWRITE_JPEG_PROGRESSIVE, int(progressive),
+    ])
+    if not ok:
+        raise ValueError("cv2.imencode failed")
+    return out.tobytes()
+
+
+ENCODERS = {"pillow": _encode_pillow, "opencv": _encode_opencv}
+
+
+# -------------------------------------------------------------
+# MAIN: encode a batch of panels across a thread pool
+# -------------------------------------------------------------
+def encode_panels(
+    images: List[Image.Image],
+    encoder: str = None,
+    quality: int = None,
+    optimize: bool = None,
+    progressive: bool = None,
+    workers: int = None,
+    stats: list = None
+) -> List[bytes]:
+    """
+    Returns JPEG bytes in the same order as `images`.
+    Pass a list as `stats` to receive one {"panel", "bytes", "ms"} per panel.
+    """
+    encode = ENCODERS.get((encoder or JPEG_ENCODER).lower())
+    if encode is None:
+        raise ValueError(f"Unknown JPEG encoder '{encoder}' (expected one of {list(ENCODERS)})")
+
+    quality = JPEG_QUALITY if quality is None else quality
+    optimize = JPEG_OPTIMIZE if optimize is None else optimize
+    progressive = JPEG_PROGRESSIVE if progressive is None else progressive
+    workers = (ENCODE_WORKERS if workers is None else workers) or available_cpus()
+
+    def _timed(img: Image.Image) -> Tuple[bytes, float]:
+        start = time.perf_counter()
+        data = encode(img, quality, optimize, progressive)
+        return data, time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(images) or 1))) as pool:
+        results = list(pool.map(_timed, images))
+    wall = time.perf_counter() - start
+
+    if stats is not None:
+        for i, (data, seconds) in enumerate(results):
+            stats.append({"panel": i, "bytes": len(data), "ms": round(seconds * 1000, 1)})
+
+    total_bytes = sum(len(data) for data, _ in results)
+    busy = sum(seconds for _, seconds in results)
+    print(
+        f"🗜 Encoded {len(images)} panels ({encoder or JPEG_ENCODER}, q={quality}, "
+        f"optimize={optimize}, progressive={progressive}) → {total_bytes / 1e6:.2f} MB "
+        f"in {wall:.2f}s wall / {busy:.2f}s busy on {workers} thread(s)"
+    )
+    return [data for data, _ in results]
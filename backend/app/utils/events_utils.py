@@ -0,0 +1,151 @@
+# backend/app/utils/events_utils.py
+"""
+Push-based job status (Redis pub/sub)
+-------------------------------------
+Worker side: every progress/terminal event is
+ - SET   manhwa:job_state:{task_id}  (last known state, for late subscribers)
+ - PUBLISH manhwa:job_events:{task_id}
+
+API side: subscribe_job_events() yields the last known state first, then
+every published event until a terminal one (SUCCESS / FAILED).
+"""
+
+import os
+import json
+import asyncio
+import redis
+import redis.asyncio as aioredis
+
+# -------------------------------------------------------------
+# CONFIGURATION
+# -------------------------------------------------------------
+REDIS_URL = os.getenv("REDIS_URL")
+JOB_STATE_TTL = int(os.getenv("JOB_STATE_TTL", 24 * 3600))
+STREAM_HEARTBEAT = float(os.getenv("STREAM_HEARTBEAT", 15.0))
+# A stream with no event for this long is closed (the client reconnects and
+# gets a fresh lookup) — a stalled or lost job never pins a connection forever
+STREAM_MAX_IDLE = float(os.getenv("STREAM_MAX_IDLE", 900.0))
+
+TERMINAL_STATES = ("SUCCESS", "FAILED")
+
+_STATE_PREFIX = "manhwa:job_state"
+_CHANNEL_PREFIX = "manhwa:job_events"
+
+redis_client = None
+if REDIS_URL:
+    try:
+        redis_client = redis.Redis.from_url(REDIS_URL, decode_responses=True, socket_timeout=5)
+    except Exception as e:
+        print(f"⚠ Job events disabled (Redis unavailable): {e}")
+
+
+def _state_key(task_id) -> str:
+    return f"{_STATE_PREFIX}:{task_id}"
+
+
+def _channel(task_id) -> str:
+    return f"{_CHANNEL_PREFIX}:{task_id}"
+
+
+# -------------------------------------------------------------
+# Worker: publish
+# -------------------------------------------------------------
+def publish_job_event(task_id, event: dict):
+    """Stores the event as the job's last known state, then broadcasts it."""
+    if redis_client is None:
+        return
+    payload = json.dumps({"task_id": str(task_id), **event})
+    try:
+        pipe = redis_client.pipeline(transaction=False)
+        pipe.set(_state_key(task_id), payload, ex=JOB_STATE_TTL)
+        pipe.publish(_channel(task_id), payload)
+        pipe.execute()
+    except Exception as e:
+        print(f"⚠ Job event publish failed: {e}")
+
+
+def get_job_state(task_id):
+    """Last known state, or None (never published / expired / no Redis)."""
+    if redis_client is None:
+        return None
+    try:
+        raw = redis_client.get(_state_key(task_id))
+        return json.loads(raw) if raw else None
+    except Exception as e:
+        print(f"⚠ Job state lookup failed: {e}")
+        return None
+
+
+# -------------------------------------------------------------
+# API: subscribe
+# -------------------------------------------------------------
+_async_client = None
+
+def get_async_redis():
+    """One pooled client for the API's event loop (each pubsub holds one connection)."""
+    global _async_client
+    if _async_client is None and REDIS_URL:
+        _async_client = aioredis.Redis.from_url(REDIS_URL, decode_responses=True)
+    return _async_client
+
+
+async def aget_job_state(task_id):
+    """Async get_job_state() for the API."""
+    client = get_async_redis()
+    if client is None:
+        return None
+    try:
+        raw = await client.get(_state_key(task_id))
+        return json.loads(raw) if raw else None
+    except Exception as e:
+        print(f"⚠ Job state lookup failed: {e}")
+        return None
+
+
+async def astore_job_state(task_id, state: dict, ttl: int):
+    """Caches a state found elsewhere (e.g. a finished job's DB row) — no publish."""
+    client = get_async_redis()
+    if client is None:
+        return
+    try:
+        await client.set(_state_key(task_id), json.dumps(state), ex=ttl)
+    except Exception as e:
+        print(f"⚠ Job state store failed: {e}")
+
+
+async def subscribe_job_events(task_id, initial_state=None):
+    """
+    Async generator of event dicts; yields None as a heartbeat every
+    STREAM_HEARTBEAT seconds of silence and stops after STREAM_MAX_IDLE
+    seconds without an event. Subscribes *before* reading the last state,
+    so nothing published in between is lost.
+    `initial_state` is used when Redis has no state for the job.
+    """
+    client = get_async_redis()
+    pubsub = client.pubsub()
+    loop = asyncio.get_running_loop()
+    try:
+        await pubsub.subscribe(_channel(task_id))
+
+        raw = await client.get(_state_key(task_id))
+        last = json.loads(raw) if raw else initial_state
+        if last is not None:
+            yield last
+            if last.get("state") in TERMINAL_STATES:
+                return
+
+        last_event = loop.time()
+        while True:
+            msg = await pubsub.get_message(ignore_subscribe_messages=True, timeout=STREAM_HEARTBEAT)
+            if msg is None:
+                if loop.time() - last_event >= STREAM_MAX_IDLE:
+                    return
+                yield None
+                continue
+            last_event = loop.time()
+            event = json.loads(msg["data"])
+            yield event
+            if event.get("state") in TERMINAL_STATES:
+                return
+    finally:
+        await pubsub.aclose()
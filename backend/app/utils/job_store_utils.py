@@ -0,0 +1,172 @@
+# backend/app/utils/job_store_utils.py
+"""
+Indexed job status store (SQLite)
+---------------------------------
+Replaces one-JSON-file-per-job in job_status/:
+ - read      : primary-key lookup instead of a file open per poll
+ - list      : keyset (cursor) pagination on (updated_at, job_id), newest
+               first, optionally filtered by status — never a full scan/sort
+ - count     : per-status counters kept by triggers, so totals are O(1)
+
+Legacy job_status/*.json files are imported once on first start.
+"""
+
+import os
+import json
+import time
+import sqlite3
+from app.utils.sqlite_utils import sqlite_connect
+
+# -------------------------------------------------------------
+# CONFIGURATION
+# -------------------------------------------------------------
+# backend/job_status (same place the JSON files lived)
+STATUS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../job_status"))
+JOB_STORE_PATH = os.getenv("JOB_STORE_PATH", os.path.join(STATUS_DIR, "jobs.sqlite3"))
+JOB_LIST_MAX = 200
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_updated ON jobs(updated_at DESC, job_id DESC);
+CREATE INDEX IF NOT EXISTS idx_jobs_status_updated ON jobs(status, updated_at DESC, job_id DESC);
+
+CREATE TABLE IF NOT EXISTS job_counts (status TEXT PRIMARY KEY, n INTEGER NOT NULL);
+CREATE TRIGGER IF NOT EXISTS jobs_count_ins AFTER INSERT ON jobs BEGIN
+    INSERT INTO job_counts VALUES (NEW.status, 1)
+        ON CONFLICT(status) DO UPDATE SET n = n + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS jobs_count_del AFTER DELETE ON jobs BEGIN
+    UPDATE job_counts SET n = n - 1 WHERE status = OLD.status;
+END;
+CREATE TRIGGER IF NOT EXISTS jobs_count_upd AFTER UPDATE OF status ON jobs
+WHEN NEW.status <> OLD.status BEGIN
+    UPDATE job_counts SET n = n - 1 WHERE status = OLD.status;
+    INSERT INTO job_counts VALUES (NEW.status, 1)
+        ON CONFLICT(status) DO UPDATE SET n = n + 1;
+END;
+
+CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT NOT NULL);
+"""
+
+
+def _connect():
+    return sqlite_connect(JOB_STORE_PATH)
+
+
+# -------------------------------------------------------------
+# Write / read
+# -------------------------------------------------------------
+def _upsert(conn: sqlite3.Connection, job_id: str, data: dict):
+    conn.execute(
+        """
+        INSERT INTO jobs (job_id, status, updated_at, data) VALUES (?, ?, ?, ?)
+        ON CONFLICT(job_id) DO UPDATE SET
+            status = excluded.status, updated_at = excluded.updated_at, data = excluded.data
+        """,
+        (job_id, data.get("status", "unknown"), float(data.get("_updated_at", 0)), json.dumps(data))
+    )
+
+
+def write_job_status(job_id: str, data: dict):
+    """Insert or replace a job's status (stamps _updated_at if missing)."""
+    data = {**data, "_updated_at": data.get("_updated_at", time.time())}
+    with _connect() as conn:
+        _upsert(conn, str(job_id), data)
+
+
+def read_job_status(job_id: str):
+    with _connect() as conn:
+        row = conn.execute("SELECT data FROM jobs WHERE job_id = ?", (str(job_id),)).fetchone()
+    return json.loads(row[0]) if row else None
+
+
+# -------------------------------------------------------------
+# List (cursor pagination) / count
+# -------------------------------------------------------------
+def _encode_cursor(updated_at: float, job_id: str) -> str:
+    return f"{updated_at!r}:{job_id}"
+
+
+def _decode_cursor(cursor: str):
+    updated_at, _, job_id = cursor.partition(":")
+    return float(updated_at), job_id
+
+
+def list_job_statuses(limit: int = 50, cursor: str = None, status: str = None):
+    """
+    Newest first. Returns (jobs, next_cursor); next_cursor is None on the
+    last page. Raises ValueError on a malformed cursor.
+    """
+    limit = max(1, min(limit, JOB_LIST_MAX))
+    where, params = [], []
+    if status:
+        where.append("status = ?")
+        params.append(status)
+    if cursor:
+        updated_at, job_id = _decode_cursor(cursor)
+        where.append("(updated_at < ? OR (updated_at = ? AND job_id < ?))")
+        params += [updated_at, updated_at, job_id]
+
+    sql = "SELECT job_id, updated_at, data FROM jobs"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY updated_at DESC, job_id DESC LIMIT ?"
+
+    with _connect() as conn:
+        rows = conn.execute(sql, params + [limit + 1]).fetchall()
+
+    jobs = [json.loads(data) for _, _, data in rows[:limit]]
+    next_cursor = _encode_cursor(rows[limit - 1][1], rows[limit - 1][0]) if len(rows) > limit else None
+    return jobs, next_cursor
+
+
+def count_job_statuses(status: str = None) -> int:
+    """O(1): reads the trigger-maintained counters."""
+    with _connect() as conn:
+        if status:
+            row = conn.execute("SELECT n FROM job_counts WHERE status = ?", (status,)).fetchone()
+            return row[0] if row else 0
+        return conn.execute("SELECT COALESCE(SUM(n), 0) FROM job_counts").fetchone()[0]
+
+
+# -------------------------------------------------------------
+# Init + one-time import of job_status/*.json
+# -------------------------------------------------------------
+def _import_legacy_files(conn: sqlite3.Connection):
+    if conn.execute("SELECT 1 FROM meta WHERE name = 'legacy_imported'").fetchone():
+        return
+    filenames = os.listdir(STATUS_DIR) if os.path.isdir(STATUS_DIR) else []
+    imported = 0
+    conn.execute("BEGIN IMMEDIATE")  # one process imports; the others wait, then skip
+    try:
+        if conn.execute("SELECT 1 FROM meta WHERE name = 'legacy_imported'").fetchone():
+            conn.execute("COMMIT")
+            return
+        for filename in filenames:
+            if not filename.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(STATUS_DIR, filename), "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            except Exception:
+                continue
+            _upsert(conn, filename[:-len(".json")], data)
+            imported += 1
+        conn.execute("INSERT INTO meta VALUES ('legacy_imported', ?)", (str(time.time()),))
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    if imported:
+        print(f"📥 Job store: imported {imported} legacy status files")
+
+
+os.makedirs(os.path.dirname(JOB_STORE_PATH), exist_ok=True)
+with _connect() as _conn:
+    _conn.executescript(_SCHEMA)
+    _import_legacy_files(_conn)
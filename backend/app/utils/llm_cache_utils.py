@@ -0,0 +1,166 @@
+# backend/app/utils/llm_cache_utils.py
+"""
+Persistent LLM response cache (SQLite on local disk)
+----------------------------------------------------
+Key  = model + prompt version + sampling params + prompt text, with every
+       inline image replaced by the SHA-256 of its bytes
+Value = raw completion text
+
+Retries, acks_late redeliveries and re-uploads of the same chapter then
+cost no extra Groq latency or quota. Size-bounded: least recently used
+entries are evicted once LLM_CACHE_MAX_MB is exceeded.
+"""
+
+import os
+import json
+import time
+import base64
+import hashlib
+import sqlite3
+from app.config import BASE_DIR
+from app.utils.sqlite_utils import sqlite_connect
+
+# -------------------------------------------------------------
+# CONFIGURATION
+# -------------------------------------------------------------
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", os.path.join(BASE_DIR, "llm_cache.sqlite3"))
+LLM_CACHE_MAX_BYTES = int(float(os.getenv("LLM_CACHE_MAX_MB", 64)) * 1024 * 1024)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    response TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_entries_last_access ON entries(last_access);
+CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL);
+INSERT OR IGNORE INTO counters VALUES ('hits', 0), ('misses', 0), ('evictions', 0);
+-- Running total of entry sizes, kept by triggers: eviction checks it
+-- instead of a SUM(size) over the whole table on every put
+INSERT OR IGNORE INTO counters SELECT 'bytes', COALESCE(SUM(size), 0) FROM entries;
+CREATE TRIGGER IF NOT EXISTS entries_bytes_ins AFTER INSERT ON entries BEGIN
+    UPDATE counters SET value = value + NEW.size WHERE name = 'bytes';
+END;
+CREATE TRIGGER IF NOT EXISTS entries_bytes_del AFTER DELETE ON entries BEGIN
+    UPDATE counters SET value = value - OLD.size WHERE name = 'bytes';
+END;
+CREATE TRIGGER IF NOT EXISTS entries_bytes_upd AFTER UPDATE OF size ON entries BEGIN
+    UPDATE counters SET value = value + NEW.size - OLD.size WHERE name = 'bytes';
+END;
+"""
+
+
+def _connect():
+    return sqlite_connect(LLM_CACHE_PATH)
+
+
+if LLM_CACHE_ENABLED:
+    try:
+        with _connect() as _conn:
+            _conn.executescript(_SCHEMA)
+    except sqlite3.Error as e:
+        print(f"⚠ LLM cache disabled: {e}")
+        LLM_CACHE_ENABLED = False
+
+
+# -------------------------------------------------------------
+# Key: images → content hashes
+# -------------------------------------------------------------
+def _normalize_content(content_list: list) -> list:
+    normalized = []
+    for part in content_list:
+        if part.get("type") == "image_url":
+            url = part["image_url"]["url"]
+            if url.startswith("data:") and "," in url:
+                data = base64.b64decode(url.split(",", 1)[1])
+                part = {"type": "image_sha256", "sha256": hashlib.sha256(data).hexdigest()}
+        normalized.append(part)
+    return normalized
+
+
+def llm_cache_key(model: str, prompt_version: str, content_list: list, **params) -> str:
+    raw = json.dumps({
+        "model": model,
+        "prompt_version": prompt_version,
+        "params": params,
+        "content": _normalize_content(content_list),
+    }, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+# -------------------------------------------------------------
+# Lookup / store / evict
+# -------------------------------------------------------------
+def _bump(conn: sqlite3.Connection, name: str, by: int = 1):
+    conn.execute("UPDATE counters SET value = value + ? WHERE name = ?", (by, name))
+
+
+def llm_cache_get(key: str):
+    if not LLM_CACHE_ENABLED:
+        return None
+    try:
+        with _connect() as conn:
+            row = conn.execute("SELECT response FROM entries WHERE key = ?", (key,)).fetchone()
+            if row:
+                conn.execute("UPDATE entries SET last_access = ? WHERE key = ?", (time.time(), key))
+            _bump(conn, "hits" if row else "misses")
+        return row[0] if row else None
+    except sqlite3.Error as e:
+        print(f"⚠ LLM cache read failed: {e}")
+        return None
+
+
+def llm_cache_put(key: str, response: str):
+    if not LLM_CACHE_ENABLED or not response:
+        return
+    now = time.time()
+    try:
+        with _connect() as conn:
+            # Upsert, not INSERT OR REPLACE: REPLACE's implicit delete skips the size triggers
+            conn.execute(
+                "INSERT INTO entries VALUES (?, ?, ?, ?, ?) ON CONFLICT(key) DO UPDATE SET "
+                "response = excluded.response, size = excluded.size, last_access = excluded.last_access",
+                (key, response, len(response.encode()), now, now)
+            )
+            _evict(conn)
+    except sqlite3.Error as e:
+        print(f"⚠ LLM cache write failed: {e}")
+
+
+def _evict(conn: sqlite3.Connection):
+    """LRU: drop oldest entries until the cache is back under 90% of budget."""
+    total = conn.execute("SELECT value FROM counters WHERE name = 'bytes'").fetchone()[0]
+    if total <= LLM_CACHE_MAX_BYTES:
+        return
+
+    target = total - int(LLM_CACHE_MAX_BYTES * 0.9)
+    freed, victims = 0, []
+    for key, size in conn.execute("SELECT key, size FROM entries ORDER BY last_access"):
+        victims.append((key,))
+        freed += size
+        if freed >= target:
+            break
+    conn.executemany("DELETE FROM entries WHERE key = ?", victims)
+    _bump(conn, "evictions", len(victims))
+
+
+def llm_cache_stats() -> dict:
+    if not LLM_CACHE_ENABLED:
+        return {"enabled": False}
+    with _connect() as conn:
+        counters = dict(conn.execute("SELECT name, value FROM counters"))
+        entries = conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+    lookups = counters["hits"] + counters["misses"]
+    return {
+        "enabled": True,
+        "entries": entries,
+        "bytes": counters["bytes"],
+        "max_bytes": LLM_CACHE_MAX_BYTES,
+        "hits": counters["hits"],
+        "misses": counters["misses"],
+        "evictions": counters["evictions"],
+        "hit_rate": round(counters["hits"] / lookups, 3) if lookups else 0.0,
+    }
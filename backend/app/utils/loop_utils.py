@@ -0,0 +1,132 @@
+# backend/app/utils/loop_utils.py
+"""
+Persistent worker event loop + loop-bound async clients
+-------------------------------------------------------
+Celery calls tasks synchronously. Instead of a new event loop per task
+(and with it new connection pools, TLS handshakes and thread hops), each
+worker process keeps one loop for its whole life (run_on_worker_loop),
+and async clients are built once per loop (loop_client):
+ - Supabase storage + DB : one pooled httpx.AsyncClient (supabase_utils),
+                           also used by the shared TTS cache tier
+ - Groq                  : AsyncGroq on its own pooled client (openai_utils)
+Edge-TTS opens one websocket per clip (and closes any connector it is
+given), so synthesis itself has no connection to keep warm.
+
+Pooled clients keep connections alive between tasks and use HTTP/2 when
+`h2` is installed. A process whose loop changes (API server, asyncio.run
+in benchmarks) simply gets fresh clients for the new loop.
+
+Prefork / solo pools only: one loop per process, not thread-safe.
+Workers started with -P threads / gevent / eventlet refuse to start
+(check_worker_pool, called from worker_init).
+"""
+
+import os
+import asyncio
+import inspect
+import importlib.util
+import httpx
+
+# -------------------------------------------------------------
+# CONFIGURATION
+# -------------------------------------------------------------
+HTTP2 = importlib.util.find_spec("h2") is not None
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", 20))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", 120))
+
+_worker_loop = None
+_clients = {"loop": None}   # name → client, all bound to _clients["loop"]
+
+
+def pooled_http_client(**kwargs) -> httpx.AsyncClient:
+    """Keep-alive (+ HTTP/2) httpx client; create it through loop_client()."""
+    return httpx.AsyncClient(
+        http2=HTTP2,
+        limits=httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_CONNECTIONS,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+        ),
+        **kwargs
+    )
+
+
+# -------------------------------------------------------------
+# Pool guard
+# -------------------------------------------------------------
+SUPPORTED_POOLS = ("celery.concurrency.prefork", "celery.concurrency.solo")
+
+
+def check_worker_pool(pool_cls):
+    """
+    Exits unless the Celery pool runs one task at a time per process.
+    SystemExit, not an exception: Celery logs and ignores those in signal handlers.
+    """
+    from celery.concurrency import ALIASES
+    if isinstance(pool_cls, str):  # "-P gevent": resolve without importing gevent
+        module = (ALIASES.get(pool_cls) or pool_cls).split(":")[0]
+    else:
+        module = pool_cls.__module__
+    if module not in SUPPORTED_POOLS:
+        raise SystemExit(
+            f"❌ Unsupported Celery pool ({module}): the worker event loop "
+            f"(loop_utils) needs -P prefork or -P solo"
+        )
+
+
+# -------------------------------------------------------------
+# Loop
+# -------------------------------------------------------------
+def get_worker_loop() -> asyncio.AbstractEventLoop:
+    global _worker_loop
+    if _worker_loop is None or _worker_loop.is_closed():
+        _worker_loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(_worker_loop)
+    return _worker_loop
+
+
+def run_on_worker_loop(coro):
+    """Runs a task's coroutine on the process's persistent loop."""
+    return get_worker_loop().run_until_complete(coro)
+
+
+# -------------------------------------------------------------
+# Clients
+# -------------------------------------------------------------
+def loop_client(name: str, factory):
+    """The running loop's `name` client, built by factory() on first use."""
+    loop = asyncio.get_running_loop()
+    if _clients["loop"] is not loop:
+        _clients.clear()        # bound to a previous loop — unusable here
+        _clients["loop"] = loop
+    if name not in _clients:
+        _clients[name] = factory()
+    return _clients[name]
+
+
+async def _close_clients():
+    for name, client in list(_clients.items()):
+        if name == "loop":
+            continue
+        close = getattr(client, "aclose", None) or getattr(client, "close", None)
+        if close is None:
+            continue
+        try:
+            result = close()
+            if inspect.isawaitable(result):
+                await result
+        except Exception as e:
+            print(f"⚠ Closing {name} client failed: {e}")
+    _clients.clear()
+    _clients["loop"] = None
+
+
+def close_worker_loop():
+    """worker_process_shutdown: close pooled connections, then the loop."""
+    global _worker_loop
+    if _worker_loop is None or _worker_loop.is_closed():
+        return
+    _worker_loop.run_until_complete(_close_clients())
+    _worker_loop.run_until_complete(_worker_loop.shutdown_asyncgens())
+    _worker_loop.close()
+    _worker_loop = None
@@ -0,0 +1,180 @@
+# backend/app/utils/metrics_utils.py
+"""
+Per-stage pipeline instrumentation
+----------------------------------
+stage_span("download", items=..., nbytes=...) times one pipeline stage and
+ - observes manhwa_stage_seconds{stage} (histogram)
+ - adds to manhwa_stage_items_total / manhwa_stage_bytes_total {stage}
+ - logs one JSON line (job id, stage, seconds, items, bytes) on "manhwa.stages"
+ - opens an OpenTelemetry span when opentelemetry-api is installed
+   (a no-op unless an SDK/exporter is configured, e.g. opentelemetry-instrument)
+
+The job id comes from job_context(task_id) — a contextvar, so it follows
+awaits and asyncio.to_thread into helpers like pdf_utils.
+
+Export — PROMETHEUS_MULTIPROC_DIR (set by start.sh / docker-compose on a
+directory shared by the API and every worker) makes each process write
+its samples to files there, so prefork children need no server of their own:
+ - API    : GET /metrics (metrics_payload) aggregates every process's files
+ - worker : optional WORKER_METRICS_PORT endpoint, started once per worker
+            in the parent (worker_init), serving the same aggregate — for
+            workers that do not share the directory with an API. Workers
+            on one host need distinct ports.
+Without the directory only the serving process's own samples are visible
+(solo pool / single process).
+"""
+
+import os
+import json
+import time
+import logging
+import contextvars
+from contextlib import contextmanager, nullcontext
+
+try:
+    import prometheus_client as prom
+    from prometheus_client import multiprocess
+except ImportError:  # metrics become no-ops, spans still log
+    prom = None
+
+try:
+    from opentelemetry import trace as otel_trace
+    _tracer = otel_trace.get_tracer("manhwa.pipeline")
+except ImportError:
+    _tracer = None
+
+logger = logging.getLogger("manhwa.stages")
+
+# -------------------------------------------------------------
+# CONFIGURATION
+# -------------------------------------------------------------
+WORKER_METRICS_PORT = int(os.getenv("WORKER_METRICS_PORT", 0))  # 0 = no worker HTTP server
+MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+
+_STAGE_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+_JOB_BUCKETS = (5, 15, 30, 60, 120, 300, 600, 1200, 1800, 3600)
+
+if prom is not None:
+    STAGE_SECONDS = prom.Histogram(
+        "manhwa_stage_seconds", "Wall time per pipeline stage", ["stage"], buckets=_STAGE_BUCKETS
+    )
+    STAGE_ITEMS = prom.Counter(
+        "manhwa_stage_items_total", "Items (pages, panels, scenes, clips) processed per stage", ["stage"]
+    )
+    STAGE_BYTES = prom.Counter(
+        "manhwa_stage_bytes_total", "Bytes produced or transferred per stage", ["stage"]
+    )
+    STAGE_ERRORS = prom.Counter(
+        "manhwa_stage_errors_total", "Stages that raised", ["stage"]
+    )
+    JOB_SECONDS = prom.Histogram(
+        "manhwa_job_seconds", "End-to-end job wall time", ["outcome"], buckets=_JOB_BUCKETS
+    )
+    JOBS = prom.Counter("manhwa_jobs_total", "Finished jobs", ["outcome"])
+
+_job_id = contextvars.ContextVar("manhwa_job_id", default=None)
+
+
+# -------------------------------------------------------------
+# Spans
+# -------------------------------------------------------------
+@contextmanager
+def job_context(task_id):
+    token = _job_id.set(str(task_id))
+    try:
+        yield
+    finally:
+        _job_id.reset(token)
+
+
+def observe_stage(stage: str, seconds: float, items: int = 0, nbytes: int = 0, error: bool = False):
+    """Records an already-timed stage (e.g. measured inside a process pool)."""
+    if prom is not None:
+        STAGE_SECONDS.labels(stage).observe(seconds)
+        if items:
+            STAGE_ITEMS.labels(stage).inc(items)
+        if nbytes:
+            STAGE_BYTES.labels(stage).inc(nbytes)
+        if error:
+            STAGE_ERRORS.labels(stage).inc()
+    logger.info(json.dumps({
+        "job_id": _job_id.get(),
+        "stage": stage,
+        "seconds": round(seconds, 4),
+        "items": items,
+        "bytes": nbytes,
+        "error": error,
+    }))
+
+
+@contextmanager
+def stage_span(stage: str, items: int = 0, nbytes: int = 0):
+    """
+    Times the block. Yields a dict; set span["items"] / span["bytes"] inside
+    the block when the counts are only known at the end.
+    """
+    span = {"items": items, "bytes": nbytes}
+    tracing = _tracer.start_as_current_span(f"manhwa.{stage}") if _tracer else nullcontext()
+    start = time.perf_counter()
+    error = False
+    with tracing as otel_span:
+        try:
+            yield span
+        except BaseException:
+            error = True
+            raise
+        finally:
+            observe_stage(stage, time.perf_counter() - start, span["items"], span["bytes"], error)
+            if otel_span is not None:
+                otel_span.set_attributes({
+                    "manhwa.job_id": _job_id.get() or "",
+                    "manhwa.items": span["items"],
+                    "manhwa.bytes": span["bytes"],
+                })
+
+
+def observe_job(outcome: str, seconds: float):
+    if prom is not None:
+        JOBS.labels(outcome).inc()
+        JOB_SECONDS.labels(outcome).observe(seconds)
+
+
+# -------------------------------------------------------------
+# Export
+# -------------------------------------------------------------
+def _registry():
+    """Aggregate of every process's files in multiprocess mode, else this process."""
+    if MULTIPROC_DIR:
+        registry = prom.CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return prom.REGISTRY
+
+
+def metrics_payload():
+    """(body, content_type) for the API's /metrics endpoint."""
+    if prom is None:
+        return b"# prometheus_client not installed\n", "text/plain"
+    return prom.generate_latest(_registry()), prom.CONTENT_TYPE_LATEST
+
+
+def worker_process_exited(pid: int):
+    """Drops a dead worker's live gauges from the shared multiprocess files."""
+    if prom is not None and MULTIPROC_DIR:
+        multiprocess.mark_process_dead(pid)
+
+
+def start_worker_metrics():
+    """
+    Called once per Celery worker in the parent process (worker_init),
+    never in prefork children — they would race for the port.
+    """
+    if prom is None or not WORKER_METRICS_PORT:
+        return
+    if not MULTIPROC_DIR:
+        print("⚠ PROMETHEUS_MULTIPROC_DIR not set: worker metrics only cover the parent (solo pool)")
+    try:
+        prom.start_http_server(WORKER_METRICS_PORT, registry=_registry())
+        print(f"📈 Worker metrics on :{WORKER_METRICS_PORT}/metrics")
+    except OSError as e:
+        print(f"⚠ Worker metrics server not started: {e}")
@@ -1,14 +1,99 @@
 import os
 import json
 import base64
+import asyncio
 import logging
-from groq import Groq
+import httpx
+from groq import AsyncGroq, RateLimitError
+from app.utils.loop_utils import loop_client, pooled_http_client
+from app.utils.ratelimit_utils import TokenBucket
+from app.utils.llm_cache_utils import llm_cache_key, llm_cache_get, llm_cache_put
+from app.utils.metrics_utils import stage_span
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("groq_utils")
 
-groq_client = Groq(api_key=os.environ.get("GROQ_API_KEY"))
+GROQ_MODEL = os.getenv("GROQ_MODEL", "meta-llama/llama-4-scout-17b-16e-instruct")
+# ⚡ Bump whenever a prompt changes — invalidates cached job results
+PROMPT_VERSION = "3"
 
+# Groq rate limiting: token bucket (requests/min, burst) + 429 retries
+GROQ_RPM = float(os.getenv("GROQ_RPM", 30))
+GROQ_BURST = int(os.getenv("GROQ_BURST", 5))
+GROQ_MAX_RETRIES = int(os.getenv("GROQ_MAX_RETRIES", 4))
+groq_limiter = TokenBucket(rate=GROQ_RPM / 60, capacity=GROQ_BURST)
+
+# Script generation: Groq vision accepts up to 5 images per request
+SCRIPT_BATCH_SIZE = int(os.getenv("SCRIPT_BATCH_SIZE", 5))
+SCRIPT_CONCURRENCY = int(os.getenv("SCRIPT_CONCURRENCY", 3))
+
+# -------------------------------------------------------------
+# Shared async client + rate-limited call
+# -------------------------------------------------------------
+def get_async_groq():
+    """
+    One AsyncGroq per event loop on a keep-alive / HTTP/2 pool — on the
+    worker's persistent loop that is one client (and warm connections) per process.
+    """
+    return loop_client("groq", lambda: AsyncGroq(
+        api_key=os.environ.get("GROQ_API_KEY"),
+        http_client=pooled_http_client(timeout=httpx.Timeout(60.0, connect=10.0), follow_redirects=True),
+    ))
+
+async def groq_chat(content_list, max_tokens, temperature=0.6, response_format=None, validate=None):
+    """
+    One Groq chat call, gated by the shared token bucket.
+    429s back off (retry-after aware) and retry; returns None on failure.
+    ⚡ Responses are cached on disk by model/prompt/params/image hashes —
+    only once validate(content) passes, so a truncated reply is never replayed.
+    """
+    kwargs = {"response_format": response_format} if response_format else {}
+
+    cache_key = llm_cache_key(
+        GROQ_MODEL, PROMPT_VERSION, content_list,
+        temperature=temperature, max_tokens=max_tokens, response_format=response_format
+    )
+    cached = llm_cache_get(cache_key)
+    if cached is not None and (validate is None or validate(cached)):
+        logger.info("⚡ LLM cache hit")
+        return cached
+
+    n_images = sum(1 for part in content_list if part.get("type") == "image_url")
+    for attempt in range(1, GROQ_MAX_RETRIES + 1):
+        with stage_span("groq_wait"):
+            await groq_limiter.acquire()
+        try:
+            with stage_span("groq_call", items=n_images) as span:
+                raw = await get_async_groq().chat.completions.with_raw_response.create(
+                    model=GROQ_MODEL,
+                    messages=[{"role": "user", "content": content_list}],
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    **kwargs
+                )
+                span["bytes"] = len(raw.http_response.content)
+            groq_limiter.update_from_headers(raw.headers)
+            completion = await raw.parse()  # AsyncAPIResponse.parse() is a coroutine
+            content = completion.choices[0].message.content
+            if content is not None and (validate is None or validate(content)):
+                llm_cache_put(cache_key, content)
+            return content
+        except RateLimitError as e:
+            delay = groq_limiter.backoff(attempt, getattr(e.response, "headers", None))
+            logger.warning(f"⏳ Groq 429 — retry {attempt}/{GROQ_MAX_RETRIES} in {delay:.1f}s")
+        except Exception as e:
+            # Logged with type + traceback: callers fall back silently on None
+            logger.exception(f"❌ Groq call failed ({type(e).__name__}): {e}")
+            return None
+    return None
+
+def image_content(img_bytes):
+    b64 = base64.b64encode(img_bytes).decode('utf-8')
+    return {"type": "image_url", "image_url": {"url": f"data:image/jpeg;base64,{b64}"}}
+
+# -------------------------------------------------------------
+# Script helpers
+# -------------------------------------------------------------
 def _extract_json_from_text(raw: str):
     if not raw: return None
     start = raw.find("{")
@@ -17,59 +102,123 @@ def _extract_json_from_text(raw: str):
         return raw[start:end + 1]
     return None
 
+def _is_script_json(raw) -> bool:
+    """True if raw holds a parseable script object with a scenes list."""
+    json_str = _extract_json_from_text(raw)
+    if not json_str:
+        return False
+    try:
+        data = json.loads(json_str)
+    except json.JSONDecodeError:
+        return False
+    return isinstance(data, dict) and bool(data.get("scenes"))
+
 def fallback_script(name: str, ocr: str):
     return {
         "full_narration": f"Yeh {name} ki kahani hai...",
         "scenes": [{"narration_segment": "Kahani shuru hoti hai...", "image_page_index": 0}]
     }
 
-def generate_cinematic_script(manga_name, manga_genre, ocr_data, image_bytes_list):
-    total_panels = len(image_bytes_list)
-    logger.info(f"→ Sending {total_panels} images to Groq.")
+async def _generate_script_batch(manga_name, manga_genre, batch, offset, story_so_far):
+    """
+    Narrates one batch of panels (global indices offset..offset+len-1).
+    Returns (scenes, summary) — scenes == [] if the call failed.
+    """
+    first, last = offset, offset + len(batch) - 1
+    continuity = f"STORY SO FAR: {story_so_far}" if story_so_far else "This is the opening of the chapter."
 
-    content_list = []
-    
     prompt = f"""
     ROLE: You are 'Manga-Bhai', a high-energy Indian YouTuber.
-    TASK: Narrate these {total_panels} panels in Hinglish (Hindi+English).
+    TASK: Narrate panels {first} to {last} in Hinglish (Hindi+English).
+    {continuity}
     FORMAT: JSON ONLY.
     {{
       "scenes": [
-        {{ "image_page_index": 0, "narration_segment": "..." }},
-        ... (Must have exactly {total_panels} items)
-      ]
+        {{ "image_page_index": {first}, "narration_segment": "..." }},
+        ... (Must have exactly {len(batch)} items, indices {first}..{last})
+      ],
+      "summary": "1-2 sentence recap of the story up to panel {last}"
     }}
     Manga: {manga_name}
+    Genre: {manga_genre}
     """
-    
-    content_list.append({"type": "text", "text": prompt})
-
-    # Limit to 3 images to avoid token overflow
-    for i, img_bytes in enumerate(image_bytes_list[:3]):
-        b64 = base64.b64encode(img_bytes).decode('utf-8')
-        content_list.append({
-            "type": "image_url",
-            "image_url": {"url": f"data:image/jpeg;base64,{b64}"}
-        })
-        content_list.append({"type": "text", "text": f"[Panel {i}]"})
 
-    try:
-        completion = groq_client.chat.completions.create(
-            # ✅ FIXED: Correct active model
-            model="meta-llama/llama-4-scout-17b-16e-instruct",
-            messages=[{"role": "user", "content": content_list}],
-            temperature=0.6,
-            max_tokens=2500,
-            response_format={"type": "json_object"} 
-        )
-
-        raw = completion.choices[0].message.content
-        json_str = _extract_json_from_text(raw)
-        if not json_str: return fallback_script(manga_name, ocr_data)
+    content_list = [{"type": "text", "text": prompt}]
+    for i, img_bytes in enumerate(batch):
+        content_list.append(image_content(img_bytes))
+        content_list.append({"type": "text", "text": f"[Panel {offset + i}]"})
 
+    raw = await groq_chat(
+        content_list,
+        max_tokens=2500,
+        response_format={"type": "json_object"},
+        validate=_is_script_json
+    )
+    json_str = _extract_json_from_text(raw)
+    if not json_str:
+        logger.error(f"❌ No script JSON for panels {first}-{last} (response: {raw!r:.200})")
+        return [], story_so_far
+
+    try:
         data = json.loads(json_str)
-        return data
+    except json.JSONDecodeError as e:
+        logger.error(f"❌ Bad JSON for panels {first}-{last} ({type(e).__name__}): {e}")
+        return [], story_so_far
+
+    # Keep only scenes that land inside this batch (models sometimes renumber from 0)
+    scenes = []
+    for k, sc in enumerate(data.get("scenes", [])[:len(batch)]):
+        idx = sc.get("image_page_index")
+        if not isinstance(idx, int) or not (first <= idx <= last):
+            idx = offset + k
+        text = str(sc.get("narration_segment", "")).strip()
+        if text:
+            scenes.append({"image_page_index": idx, "narration_segment": text})
+
+    return scenes, str(data.get("summary", "")).strip() or story_so_far
+
+# -------------------------------------------------------------
+# MAIN: chunked script generation over every panel
+# -------------------------------------------------------------
+async def generate_cinematic_script(manga_name, manga_genre, ocr_data, image_bytes_list, on_scenes=None):
+    """
+    Splits panels into SCRIPT_BATCH_SIZE batches and narrates them in waves
+    of SCRIPT_CONCURRENCY concurrent calls. Each wave gets the rolling
+    summary of the previous one, so continuity survives the parallelism.
+    LLM round trips: O(panels / batch) instead of O(panels).
+    on_scenes(scenes, panels_done) is awaited after every wave.
+    """
+    total_panels = len(image_bytes_list)
+    batches = [
+        (start, image_bytes_list[start:start + SCRIPT_BATCH_SIZE])
+        for start in range(0, total_panels, SCRIPT_BATCH_SIZE)
+    ]
+    logger.info(f"→ Sending {total_panels} images to Groq in {len(batches)} batches.")
+
+    by_index = {}
+    story_so_far = ""
+    for w in range(0, len(batches), SCRIPT_CONCURRENCY):
+        wave = batches[w:w + SCRIPT_CONCURRENCY]
+        results = await asyncio.gather(*[
+            _generate_script_batch(manga_name, manga_genre, batch, offset, story_so_far)
+            for offset, batch in wave
+        ])
+        wave_scenes = []
+        for scenes, summary in results:
+            for sc in scenes:
+                if sc["image_page_index"] not in by_index:
+                    by_index[sc["image_page_index"]] = sc
+                    wave_scenes.append(dict(sc))
+        if on_scenes is not None:
+            done = min(total_panels, (w + len(wave)) * SCRIPT_BATCH_SIZE)
+            await on_scenes(wave_scenes, done)
+        # Rolling summary = recap from the last batch of the wave that produced one
+        story_so_far = next((s for _, s in reversed(results) if s), story_so_far)
+
+    if not by_index:
+        logger.error("❌ Groq Script Gen Failed for every batch")
+        return fallback_script(manga_name, ocr_data)
 
-    except Exception as e:
-        logger.error(f"❌ Groq Script Gen Failed: {e}")
-        return fallback_script(manga_name, ocr_data)
\ No newline at end of file
+    scenes = [by_index[i] for i in sorted(by_index)]
+    logger.info(f"✔ Script covers {len(scenes)}/{total_panels} panels")
+    return {"scenes": scenes, "summary": story_so_far}
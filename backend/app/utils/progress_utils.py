@@ -0,0 +1,182 @@
+# backend/app/utils/progress_utils.py
+"""
+Progressive job state (stage, percent, growing manifest)
+--------------------------------------------------------
+The worker publishes what is already usable while the job runs:
+ - panel URLs as soon as they are uploaded
+ - scenes as each script wave is narrated
+ - one audio URL per scene as its TTS clip is uploaded
+
+Three channels:
+ - Celery result backend: state "PROGRESS" with {stage, percent, manifest_url}
+   (cheap, read by GET /api/v1/status/{task_id})
+ - Redis pub/sub (events_utils): the same state pushed to stream subscribers
+ - {manga_folder}/manifest.json in storage: the full partial result,
+   rewritten at most every MANIFEST_INTERVAL seconds and at every stage change
+
+When the pipeline runs as separate stage tasks, each stage resumes the
+reporter from the previous stage's snapshot() (see artifact_utils).
+"""
+
+import os
+import json
+import time
+import asyncio
+from app.utils.supabase_utils import supabase_upload_async
+from app.utils.events_utils import publish_job_event
+
+MANIFEST_INTERVAL = float(os.getenv("MANIFEST_INTERVAL", 2.0))
+
+# stage → percent reached when the stage *starts*
+STAGES = {
+    "queued": 0,
+    "downloading": 2,
+    "extracting": 5,
+    "uploading_panels": 20,
+    "scripting": 30,
+    "narrating": 60,
+    "assembling": 90,
+    "finalizing": 97,
+    "done": 100,
+    "failed": 100,
+}
+_NEXT_PERCENT = dict(zip(STAGES, list(STAGES.values())[1:] + [100]))
+
+
+class ProgressReporter:
+    """One per job. Call from the job's event loop only."""
+
+    def __init__(self, task_id: str, manifest_path: str, celery_task=None):
+        self.task_id = str(task_id)
+        self.manifest_path = manifest_path
+        self.celery_task = celery_task
+        self.manifest_url = None
+        self.stage_name = "queued"
+        self.percent = 0
+        self.job_state = "PROCESSING"
+        self.manifest = {
+            "task_id": self.task_id,
+            "stage": "queued",
+            "percent": 0,
+            "image_urls": [],
+            "scenes": {},          # panel index → scene (narration, later timing + audio_url)
+            "complete": False,
+        }
+        self._last_write = 0.0
+        self._write_lock = None  # created lazily inside the job's loop
+
+    def snapshot(self) -> dict:
+        """JSON-safe state for the next pipeline stage (possibly another worker)."""
+        return {
+            "stage": self.stage_name,
+            "percent": self.percent,
+            "manifest_url": self.manifest_url,
+            "manifest": self.manifest,
+        }
+
+    @classmethod
+    def resume(cls, task_id: str, manifest_path: str, snapshot: dict = None, celery_task=None):
+        reporter = cls(task_id, manifest_path, celery_task)
+        if snapshot:
+            reporter.stage_name = snapshot["stage"]
+            reporter.percent = snapshot["percent"]
+            reporter.manifest_url = snapshot["manifest_url"]
+            reporter.manifest = snapshot["manifest"]
+        return reporter
+
+    # ---------------------------------------------------------
+    # Updates
+    # ---------------------------------------------------------
+    async def stage(self, name: str):
+        self.stage_name = name
+        self._set_percent(STAGES[name])
+        await self._publish(force=True)
+
+    async def advance(self, done: int, total: int):
+        """Interpolate inside the current stage (e.g. 12 of 40 clips)."""
+        lo, hi = STAGES[self.stage_name], _NEXT_PERCENT[self.stage_name]
+        self._set_percent(lo + (hi - lo) * done / max(total, 1))
+        await self._publish()
+
+    async def panels(self, image_urls: list):
+        self.manifest["image_urls"] = list(image_urls)
+        await self._publish(force=True)
+
+    async def scenes(self, scenes: list):
+        for sc in scenes:
+            self.manifest["scenes"].setdefault(str(sc["image_page_index"]), {}).update(sc)
+        await self._publish()
+
+    async def scene_audio(self, index: int, audio_url: str, duration: float):
+        self.manifest["scenes"].setdefault(str(index), {"image_page_index": index}).update(
+            {"audio_url": audio_url, "duration": round(duration, 2)}
+        )
+        await self._publish()
+
+    async def complete(self, result: dict):
+        self.manifest.update(result)
+        self.manifest["complete"] = True
+        self.stage_name = "done"
+        self.job_state = "SUCCESS"
+        self._set_percent(100)
+        await self._publish(force=True)
+
+    async def fail(self, error: str):
+        """Terminal event only — the manifest keeps the last partial state."""
+        self.stage_name = "failed"
+        self.job_state = "FAILED"
+        publish_job_event(self.task_id, {**self.event(), "error": error})
+
+    def _set_percent(self, value: float):
+        self.percent = max(self.percent, int(value))  # never goes backwards
+        self.manifest["stage"] = self.stage_name
+        self.manifest["percent"] = self.percent
+
+    # ---------------------------------------------------------
+    # Publishing
+    # ---------------------------------------------------------
+    def state(self) -> dict:
+        return {
+            "stage": self.stage_name,
+            "percent": self.percent,
+            "manifest_url": self.manifest_url,
+            "panels": len(self.manifest["image_urls"]),
+            "scenes": len(self.manifest["scenes"]),
+        }
+
+    def event(self) -> dict:
+        """Same shape as GET /api/v1/status/{task_id}."""
+        return {
+            "state": self.job_state,
+            "stage": self.stage_name,
+            "progress": self.percent,
+            "manifest_url": self.manifest_url,
+            "result": self.manifest.get("result_url"),
+        }
+
+    async def _publish(self, force: bool = False):
+        if force or time.monotonic() - self._last_write >= MANIFEST_INTERVAL:
+            self._last_write = time.monotonic()
+            await self._write_manifest()
+
+        publish_job_event(self.task_id, self.event())
+
+        if self.celery_task is not None:
+            try:
+                # explicit task_id: stage tasks report under the job's id
+                self.celery_task.update_state(task_id=self.task_id, state="PROGRESS", meta=self.state())
+            except Exception as e:
+                print(f"⚠ Progress update failed: {e}")
+
+    async def _write_manifest(self):
+        # Serialized so an older snapshot never overwrites a newer one
+        if self._write_lock is None:
+            self._write_lock = asyncio.Lock()
+        snapshot = json.dumps(self.manifest).encode()
+        async with self._write_lock:
+            try:
+                self.manifest_url = await supabase_upload_async(
+                    snapshot, self.manifest_path, "application/json"
+                )
+            except Exception as e:
+                print(f"⚠ Manifest upload failed: {e}")
@@ -0,0 +1,151 @@
+# backend/app/utils/raster_utils.py
+"""
+Pluggable PDF → image rasterizers
+---------------------------------
+ - pdfium   (pypdfium2)  : renders straight into a raw bitmap buffer
+ - pymupdf  (fitz)       : renders straight into a raw pixmap buffer
+ - poppler  (pdf2image)  : spawns pdftoppm — kept as the fallback
+
+Every backend yields RGB PIL images backed by raw pixel buffers
+(no intermediate JPEG encode/decode).
+"""
+
+import os
+import shutil
+from typing import Iterator, List
+from PIL import Image
+
+# "auto" → first importable backend in _AUTO_ORDER
+PDF_RASTERIZER = os.getenv("PDF_RASTERIZER", "auto").lower()
+
+
+# ----------------------------------------------------------
+# 0. Interface
+# ----------------------------------------------------------
+class PdfRasterizer:
+    name = "base"
+
+    @staticmethod
+    def available() -> bool:
+        return False
+
+    def render(self, pdf_path: str, dpi: int, max_pages: int) -> Iterator[Image.Image]:
+        raise NotImplementedError
+
+
+# ----------------------------------------------------------
+# 1. pdfium backend
+# ----------------------------------------------------------
+class PdfiumRasterizer(PdfRasterizer):
+    name = "pdfium"
+
+    @staticmethod
+    def available() -> bool:
+        try:
+            import pypdfium2  # noqa: F401
+            return True
+        except ImportError:
+            return False
+
+    def render(self, pdf_path: str, dpi: int, max_pages: int) -> Iterator[Image.Image]:
+        import pypdfium2 as pdfium
+
+        pdf = pdfium.PdfDocument(pdf_path)
+        try:
+            for i in range(min(len(pdf), max_pages)):
+                page = pdf[i]
+                bitmap = page.render(scale=dpi / 72, rev_byteorder=True)
+                # to_pil() wraps the bitmap buffer; convert() detaches it before close
+                yield bitmap.to_pil().convert("RGB")
+                bitmap.close()
+                page.close()
+        finally:
+            pdf.close()
+
+
+# ----------------------------------------------------------
+# 2. PyMuPDF backend
+# ----------------------------------------------------------
+class PyMuPDFRasterizer(PdfRasterizer):
+    name = "pymupdf"
+
+    @staticmethod
+    def available() -> bool:
+        try:
+            import fitz  # noqa: F401
+            return True
+        except ImportError:
+            return False
+
+    def render(self, pdf_path: str, dpi: int, max_pages: int) -> Iterator[Image.Image]:
+        import fitz
+
+        doc = fitz.open(pdf_path)
+        try:
+            for i in range(min(doc.page_count, max_pages)):
+                pix = doc[i].get_pixmap(dpi=dpi, alpha=False)
+                yield Image.frombytes("RGB", (pix.width, pix.height), pix.samples)
+        finally:
+            doc.close()
+
+
+# ----------------------------------------------------------
+# 3. Poppler backend (fallback)
+# ----------------------------------------------------------
+class PopplerRasterizer(PdfRasterizer):
+    name = "poppler"
+
+    @staticmethod
+    def available() -> bool:
+        try:
+            import pdf2image  # noqa: F401
+            return shutil.which("pdftoppm") is not None
+        except ImportError:
+            return False
+
+    def render(self, pdf_path: str, dpi: int, max_pages: int) -> Iterator[Image.Image]:
+        from pdf2image import convert_from_path
+
+        # ppm = raw pixels over the pipe (no JPEG round trip)
+        pages = convert_from_path(
+            pdf_path,
+            dpi=dpi,
+            first_page=1,
+            last_page=max_pages,
+            fmt="ppm"
+        )
+        for img in pages:
+            yield img.convert("RGB")
+
+
+# ----------------------------------------------------------
+# 4. Registry
+# ----------------------------------------------------------
+RASTERIZERS = {
+    cls.name: cls for cls in (PdfiumRasterizer, PyMuPDFRasterizer, PopplerRasterizer)
+}
+_AUTO_ORDER = ["pdfium", "pymupdf", "poppler"]
+
+
+def available_rasterizers() -> List[str]:
+    return [name for name in _AUTO_ORDER if RASTERIZERS[name].available()]
+
+
+def get_rasterizer(name: str = None) -> PdfRasterizer:
+    """
+    Returns the requested backend, or the best available one for "auto".
+    Unknown / missing backends fall back to poppler with a warning.
+    """
+    name = (name or PDF_RASTERIZER).lower()
+
+    if name == "auto":
+        for candidate in _AUTO_ORDER:
+            if RASTERIZERS[candidate].available():
+                return RASTERIZERS[candidate]()
+        raise RuntimeError("❌ No PDF rasterizer available (install pypdfium2 or pdf2image)")
+
+    cls = RASTERIZERS.get(name)
+    if cls is None or not cls.available():
+        print(f"⚠ Rasterizer '{name}' not available, falling back to poppler")
+        cls = PopplerRasterizer
+    return cls()
@@ -0,0 +1,87 @@
+# backend/app/utils/ratelimit_utils.py
+"""
+Async token-bucket limiter that follows the provider's rate-limit headers
+-------------------------------------------------------------------------
+ - refills at `rate` requests/sec up to `capacity` (burst)
+ - x-ratelimit-remaining-* == 0  → pause until x-ratelimit-reset-*
+ - 429 / retry-after             → pause every caller for that long
+"""
+
+import re
+import time
+import random
+import asyncio
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_UNIT_SECONDS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+def parse_reset(value) -> float:
+    """'2m59.56s' / '7.66s' / '120ms' / '3' → seconds (0.0 if unparseable)."""
+    if value is None:
+        return 0.0
+    value = str(value).strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    return sum(float(n) * _UNIT_SECONDS[u] for n, u in _DURATION_PART.findall(value))
+
+
+class TokenBucket:
+    """
+    Single-event-loop limiter. There is no await between the token check
+    and the decrement, so it needs no lock (and survives a new loop per task).
+    """
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        while True:
+            now = time.monotonic()
+            if now < self.blocked_until:
+                await asyncio.sleep(self.blocked_until - now)
+                continue
+            self._refill(now)
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def block_for(self, seconds: float):
+        if seconds > 0:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+            self.tokens = 0.0
+
+    def update_from_headers(self, headers):
+        """Shrink the local budget to what the server says is left."""
+        if not headers:
+            return
+        for kind in ("requests", "tokens"):
+            remaining = headers.get(f"x-ratelimit-remaining-{kind}")
+            if remaining is None:
+                continue
+            try:
+                remaining = int(float(remaining))
+            except ValueError:
+                continue
+            if remaining <= 0:
+                self.block_for(parse_reset(headers.get(f"x-ratelimit-reset-{kind}")))
+            elif kind == "requests":
+                self.tokens = min(self.tokens, remaining)
+
+    def backoff(self, attempt: int, headers=None) -> float:
+        """After a 429: honour retry-after, else exponential backoff with jitter."""
+        retry_after = parse_reset((headers or {}).get("retry-after"))
+        delay = retry_after or min(30.0, (2 ** attempt) + random.random())
+        self.block_for(delay)
+        return delay
@@ -0,0 +1,20 @@
+# backend/app/utils/sqlite_utils.py
+
+import sqlite3
+from contextlib import contextmanager
+
+
+@contextmanager
+def sqlite_connect(path: str):
+    """
+    Short-lived autocommit connection (one per operation), so callers are
+    safe across threads, asyncio tasks and worker processes. WAL lets
+    readers proceed while another process writes.
+    """
+    conn = sqlite3.connect(path, timeout=5, isolation_level=None)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        yield conn
+    finally:
+        conn.close()
@@ -0,0 +1,165 @@
+# backend/app/utils/status_utils.py
+"""
+Cached, non-blocking job status lookups
+---------------------------------------
+lookup_status(task_id) resolves in this order:
+ 1. in-process cache of terminal states (finished jobs never change)
+ 2. last published state in Redis (events_utils) — progress or terminal
+ 3. Celery result meta, read straight from Redis with the async client
+ 4. Supabase `jobs` row over async httpx (terminal results are then cached
+    in-process and in Redis with STATUS_CACHE_TTL)
+
+Concurrent polls for the same task_id share one in-flight lookup.
+No step holds a threadpool slot.
+"""
+
+import os
+import time
+import asyncio
+import httpx
+from collections import OrderedDict
+from fastapi import HTTPException
+from app.celery_app import celery_app
+from app.utils.events_utils import (
+    TERMINAL_STATES, get_async_redis, aget_job_state, astore_job_state
+)
+
+# -------------------------------------------------------------
+# CONFIGURATION
+# -------------------------------------------------------------
+SUPABASE_URL = os.getenv("SUPABASE_URL")
+SUPABASE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY") or os.getenv("SUPABASE_KEY")
+STATUS_CACHE_TTL = int(os.getenv("STATUS_CACHE_TTL", 24 * 3600))
+STATUS_LOCAL_TTL = float(os.getenv("STATUS_LOCAL_TTL", 600))
+STATUS_LOCAL_MAX = int(os.getenv("STATUS_LOCAL_MAX", 10000))
+
+_CELERY_ACTIVE = ("PENDING", "STARTED", "RETRY")
+
+# -------------------------------------------------------------
+# 1. In-process terminal cache (LRU + TTL)
+# -------------------------------------------------------------
+_local = OrderedDict()  # task_id → (expires_at, status)
+
+
+def _local_get(task_id: str):
+    entry = _local.get(task_id)
+    if entry is None:
+        return None
+    if entry[0] < time.monotonic():
+        del _local[task_id]
+        return None
+    _local.move_to_end(task_id)
+    return entry[1]
+
+
+def _local_put(task_id: str, status: dict):
+    _local[task_id] = (time.monotonic() + STATUS_LOCAL_TTL, status)
+    _local.move_to_end(task_id)
+    while len(_local) > STATUS_LOCAL_MAX:
+        _local.popitem(last=False)
+
+
+# -------------------------------------------------------------
+# Async clients (one per API process)
+# -------------------------------------------------------------
+_http = None
+
+
+def _get_http():
+    global _http
+    if _http is None:
+        _http = httpx.AsyncClient(
+            base_url=f"{SUPABASE_URL}/rest/v1",
+            headers={"apikey": SUPABASE_KEY, "Authorization": f"Bearer {SUPABASE_KEY}"},
+            timeout=10.0,
+        )
+    return _http
+
+
+# -------------------------------------------------------------
+# 3. Celery meta (Redis result backend)
+# -------------------------------------------------------------
+async def _celery_meta(task_id: str):
+    """{status, result} from the result backend without a blocking client."""
+    backend = celery_app.backend
+    client = get_async_redis()
+    if hasattr(backend, "get_key_for_task") and client is not None:
+        key = backend.get_key_for_task(task_id)
+        raw = await client.get(key.decode() if isinstance(key, bytes) else key)
+        return backend.decode(raw) if raw else {"status": "PENDING", "result": None}
+
+    # Non-Redis backend: fall back to the sync client off the loop
+    result = await asyncio.to_thread(lambda: celery_app.AsyncResult(task_id))
+    return {"status": result.state, "result": result.info}
+
+
+# -------------------------------------------------------------
+# 4. Supabase jobs row
+# -------------------------------------------------------------
+async def _job_row(task_id: str):
+    resp = await _get_http().get(
+        "/jobs", params={"id": f"eq.{task_id}", "select": "id,status,result_url"}
+    )
+    resp.raise_for_status()
+    rows = resp.json()
+    return rows[0] if rows else None
+
+
+# -------------------------------------------------------------
+# MAIN
+# -------------------------------------------------------------
+async def _resolve(task_id: str) -> dict:
+    state = await aget_job_state(task_id)
+    if state is not None:
+        return state
+
+    meta = await _celery_meta(task_id)
+    if meta["status"] == "PROGRESS":
+        info = meta.get("result") or {}
+        return {
+            "task_id": task_id,
+            "state": "PROCESSING",
+            "stage": info.get("stage"),
+            "progress": info.get("percent", 0),
+            "manifest_url": info.get("manifest_url"),
+        }
+    if meta["status"] in _CELERY_ACTIVE:
+        return {"task_id": task_id, "state": "PROCESSING", "stage": "queued", "progress": 0}
+
+    rec = await _job_row(task_id)
+    if rec is None:
+        raise HTTPException(404, "Task not found")
+    status = {"task_id": str(rec["id"]), "state": rec["status"], "result": rec.get("result_url")}
+    if status["state"] in TERMINAL_STATES:
+        await astore_job_state(task_id, status, STATUS_CACHE_TTL)
+    return status
+
+
+async def require_job(task_id: str):
+    """
+    404 unless the job has a Supabase row. Celery reports unknown ids as
+    PENDING, so a non-terminal lookup alone does not prove the job exists.
+    """
+    if await _job_row(task_id) is None:
+        raise HTTPException(404, "Task not found")
+
+
+_inflight = {}  # task_id → Task shared by concurrent polls
+
+
+async def lookup_status(task_id: str) -> dict:
+    cached = _local_get(task_id)
+    if cached is not None:
+        return cached
+
+    task = _inflight.get(task_id)
+    if task is None:
+        task = asyncio.ensure_future(_resolve(task_id))
+        _inflight[task_id] = task
+        task.add_done_callback(lambda _: _inflight.pop(task_id, None))
+
+    # shield: one caller disconnecting must not cancel the others' lookup
+    status = await asyncio.shield(task)
+    if status.get("state") in TERMINAL_STATES:
+        _local_put(task_id, status)
+    return status
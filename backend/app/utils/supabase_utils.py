@@ -2,7 +2,11 @@
 
 import os
 import time
-from supabase import create_client, Client
+import asyncio
+import httpx
+from supabase import create_client, Client, AsyncClient
+from supabase.lib.client_options import AsyncClientOptions
+from app.utils.loop_utils import loop_client, pooled_http_client
 
 
 # -------------------------------------------------------------
@@ -18,7 +22,7 @@ if not SUPABASE_URL or not SUPABASE_KEY:
     )
 
 # -------------------------------------------------------------
-# Initialize Client (sync only)
+# Initialize Client (sync — the API and helper threads)
 # -------------------------------------------------------------
 try:
     supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
@@ -39,10 +43,13 @@ def _clean_path(path: str) -> str:
 # -------------------------------------------------------------
 # SYNC Upload helper
 # -------------------------------------------------------------
-def supabase_upload(file_bytes: bytes, file_path: str, content_type: str) -> str:
+def supabase_upload(file_bytes, file_path: str, content_type: str) -> str:
     """
     Uploads file to Supabase Storage with RETRY logic.
     Handles 'Server disconnected' errors by retrying.
+
+    `file_bytes` may also be a local file path (str) — the storage
+    client then streams it from disk instead of from memory.
     """
     max_retries = 3
     
@@ -54,11 +61,18 @@ def supabase_upload(file_bytes: bytes, file_path: str, content_type: str) -> str
             # ... (omitted for simplicity, sticking to overwrite)
 
             # Upload (using 'upsert' to overwrite if exists)
-            res = supabase.storage.from_(SUPABASE_BUCKET).upload(
-                path=file_path,
-                file=file_bytes,
-                file_options={"content-type": content_type, "upsert": "true"}
-            )
+            file_options = {"content-type": content_type, "upsert": "true"}
+            if isinstance(file_bytes, str):
+                # Opened (and closed) here per attempt — a str path handed to
+                # storage3 is opened by the client and never closed
+                with open(file_bytes, "rb") as f:
+                    supabase.storage.from_(SUPABASE_BUCKET).upload(
+                        path=file_path, file=f, file_options=file_options
+                    )
+            else:
+                supabase.storage.from_(SUPABASE_BUCKET).upload(
+                    path=file_path, file=file_bytes, file_options=file_options
+                )
             
             # Construct Public URL
             # Note: Supabase Python SDK usage varies. 
@@ -87,4 +101,67 @@ def supabase_upload(file_bytes: bytes, file_path: str, content_type: str) -> str
             # ⚡ CRITICAL FIX for "Server Disconnected":
             # Sometimes the global client connection gets stale. 
             # We rarely can "reset" the global client easily here without re-initializing,
-            # but usually, a short sleep + retry is enough for httpx to pick a new connection.
\ No newline at end of file
+            # but usually, a short sleep + retry is enough for httpx to pick a new connection.
+
+
+# -------------------------------------------------------------
+# STREAMING Upload helper (large files)
+# -------------------------------------------------------------
+def supabase_upload_file(local_path: str, file_path: str, content_type: str) -> str:
+    """
+    Uploads a file that is already on disk without reading it into memory.
+    Each retry re-opens the file, so a half-sent attempt is never reused.
+    """
+    return supabase_upload(str(local_path), file_path, content_type)
+
+
+# -------------------------------------------------------------
+# ASYNC helpers (worker) — pooled client on the running loop
+# -------------------------------------------------------------
+def get_async_supabase() -> AsyncClient:
+    """
+    Storage + DB share one keep-alive / HTTP/2 httpx pool (same host).
+    Built once per event loop — once per process on the worker's loop.
+    """
+    def _make():
+        http = loop_client("supabase_http", lambda: pooled_http_client(
+            timeout=httpx.Timeout(60.0, connect=10.0), follow_redirects=True
+        ))
+        return AsyncClient(SUPABASE_URL, SUPABASE_KEY, AsyncClientOptions(
+            headers={"Authorization": f"Bearer {SUPABASE_KEY}"},
+            httpx_client=http,
+        ))
+    return loop_client("supabase", _make)
+
+
+async def supabase_upload_async(file_bytes, file_path: str, content_type: str) -> str:
+    """
+    supabase_upload without the thread hop: same retries, same public URL.
+    `file_bytes` may be a local path (streamed from disk, reopened per attempt).
+    """
+    max_retries = 3
+    bucket = get_async_supabase().storage.from_(SUPABASE_BUCKET)
+    file_options = {"content-type": content_type, "upsert": "true"}
+
+    for attempt in range(1, max_retries + 1):
+        try:
+            if isinstance(file_bytes, str):
+                with open(file_bytes, "rb") as f:
+                    await bucket.upload(path=file_path, file=f, file_options=file_options)
+            else:
+                await bucket.upload(path=file_path, file=file_bytes, file_options=file_options)
+
+            public_url = await bucket.get_public_url(file_path)
+            print(f"✔ Uploaded → {public_url}")
+            return public_url
+
+        except Exception as e:
+            print(f"⚠ Upload attempt {attempt}/{max_retries} failed: {str(e).lower()}")
+            if attempt == max_retries:
+                raise RuntimeError(f"❌ Supabase upload failed after {max_retries} attempts: {e}")
+            await asyncio.sleep(1.5 * attempt)
+
+
+async def supabase_update_job_async(task_id, fields: dict):
+    """UPDATE jobs SET fields WHERE id = task_id, over the pooled client."""
+    await get_async_supabase().table("jobs").update(fields).eq("id", task_id).execute()
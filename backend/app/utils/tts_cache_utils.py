@@ -0,0 +1,240 @@
+# backend/app/utils/tts_cache_utils.py
+"""
+Two-tier TTS cache
+------------------
+Tier 1 — local disk: SQLite index next to the MP3s in TTS_CACHE_DIR with
+duration, byte size, voice and last access per clip:
+ - cache hits return the stored duration (no MP3 decode)
+ - the directory is kept under TTS_CACHE_MAX_MB by LRU eviction
+ - hit/miss/eviction counters for hit-rate stats
+
+Tier 2 — shared store (TTS_SHARED_CACHE) so worker replicas reuse each
+other's clips: "none" (default), "dir:/path" (shared volume, or a local
+stand-in for tests) or "supabase". Opt-in only: "supabase" stores the
+clips under tts_cache/ in SUPABASE_BUCKET, which is a public bucket —
+anyone who can guess/derive a key can fetch the narration audio.
+"""
+
+import os
+import asyncio
+import time
+import shutil
+from app.config import TTS_CACHE_DIR
+from app.utils.sqlite_utils import sqlite_connect
+
+# -------------------------------------------------------------
+# CONFIGURATION
+# -------------------------------------------------------------
+TTS_CACHE_MAX_BYTES = int(float(os.getenv("TTS_CACHE_MAX_MB", 512)) * 1024 * 1024)
+TTS_INDEX_PATH = os.path.join(TTS_CACHE_DIR, "index.sqlite3")
+TTS_SHARED_CACHE = os.getenv("TTS_SHARED_CACHE", "none")  # "supabase" = public bucket, see above
+TTS_SHARED_PREFIX = "tts_cache"
+# Unindexed files older than this are swept at startup (legacy md5 clips,
+# old *_fallback.mp3, .part files left by a killed worker)
+TTS_ORPHAN_MAX_AGE = float(os.getenv("TTS_ORPHAN_MAX_AGE_HOURS", 24)) * 3600
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS clips (
+    key TEXT PRIMARY KEY,
+    path TEXT NOT NULL,
+    duration REAL NOT NULL,
+    size INTEGER NOT NULL,
+    voice TEXT NOT NULL,
+    created REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_clips_last_access ON clips(last_access);
+CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL);
+INSERT OR IGNORE INTO counters VALUES ('hits', 0), ('misses', 0), ('evictions', 0), ('shared_hits', 0);
+"""
+
+def _sweep_orphans(max_age: float = None) -> int:
+    """
+    Deletes files next to the index that the index does not know about and
+    that are older than max_age. Silence clips are shared, not indexed, and kept.
+    """
+    max_age = TTS_ORPHAN_MAX_AGE if max_age is None else max_age
+    cache_dir = os.path.dirname(TTS_INDEX_PATH)
+    index_name = os.path.basename(TTS_INDEX_PATH)
+    with sqlite_connect(TTS_INDEX_PATH) as conn:
+        indexed = {os.path.abspath(p) for (p,) in conn.execute("SELECT path FROM clips")}
+
+    cutoff = time.time() - max_age
+    removed = 0
+    for entry in os.scandir(cache_dir):
+        if (not entry.is_file(follow_symlinks=False)
+                or entry.name.startswith(index_name)
+                or entry.name.startswith("silence_") and not entry.name.endswith(".part.mp3")
+                or os.path.abspath(entry.path) in indexed):
+            continue
+        try:
+            if entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+                removed += 1
+        except FileNotFoundError:
+            pass
+    if removed:
+        print(f"🧹 TTS cache: swept {removed} unindexed files")
+    return removed
+
+
+os.makedirs(TTS_CACHE_DIR, exist_ok=True)
+with sqlite_connect(TTS_INDEX_PATH) as _conn:
+    _conn.executescript(_SCHEMA)
+_sweep_orphans()
+
+
+def _bump(conn, name: str, by: int = 1):
+    conn.execute("UPDATE counters SET value = value + ? WHERE name = ?", (by, name))
+
+
+# -------------------------------------------------------------
+# Lookup / store
+# -------------------------------------------------------------
+def tts_cache_lookup(key: str):
+    """Returns (path, duration) on a hit, else None. Counts hits/misses."""
+    with sqlite_connect(TTS_INDEX_PATH) as conn:
+        row = conn.execute("SELECT path, duration FROM clips WHERE key = ?", (key,)).fetchone()
+        if row and not os.path.exists(row[0]):
+            conn.execute("DELETE FROM clips WHERE key = ?", (key,))  # file vanished (/tmp wiped)
+            row = None
+        if row:
+            conn.execute("UPDATE clips SET last_access = ? WHERE key = ?", (time.time(), key))
+        _bump(conn, "hits" if row else "misses")
+    return (row[0], row[1]) if row else None
+
+
+def tts_cache_store(key: str, path: str, duration: float, voice: str):
+    now = time.time()
+    size = os.path.getsize(path)
+    with sqlite_connect(TTS_INDEX_PATH) as conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO clips VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (key, path, duration, size, voice, now, now)
+        )
+        _evict(conn, keep=key)
+
+
+def _evict(conn, keep: str):
+    """LRU: delete oldest clips (file + row) until back under 90% of budget."""
+    total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM clips").fetchone()[0]
+    if total <= TTS_CACHE_MAX_BYTES:
+        return
+
+    target = total - int(TTS_CACHE_MAX_BYTES * 0.9)
+    freed, victims = 0, []
+    for key, path, size in conn.execute("SELECT key, path, size FROM clips ORDER BY last_access"):
+        if key == keep:
+            continue
+        victims.append((key, path))
+        freed += size
+        if freed >= target:
+            break
+
+    for key, path in victims:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+    conn.executemany("DELETE FROM clips WHERE key = ?", [(k,) for k, _ in victims])
+    _bump(conn, "evictions", len(victims))
+    print(f"🧹 TTS cache: evicted {len(victims)} clips ({freed / 1e6:.1f} MB)")
+
+
+def tts_cache_count_shared_hit():
+    with sqlite_connect(TTS_INDEX_PATH) as conn:
+        _bump(conn, "shared_hits")
+
+
+def tts_cache_stats() -> dict:
+    with sqlite_connect(TTS_INDEX_PATH) as conn:
+        counters = dict(conn.execute("SELECT name, value FROM counters"))
+        clips, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM clips").fetchone()
+    lookups = counters["hits"] + counters["misses"]
+    return {
+        "clips": clips,
+        "bytes": size,
+        "max_bytes": TTS_CACHE_MAX_BYTES,
+        "hits": counters["hits"],
+        "misses": counters["misses"],
+        "evictions": counters["evictions"],
+        "hit_rate": round(counters["hits"] / lookups, 3) if lookups else 0.0,
+        "shared_tier": TTS_SHARED_CACHE if shared_store else "none",
+        "shared_hits": counters["shared_hits"],
+    }
+
+
+# -------------------------------------------------------------
+# Tier 2: shared stores
+# -------------------------------------------------------------
+class DirTTSStore:
+    """Shared directory (NFS / volume) — also the local stand-in for tests."""
+
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, f"{key}.mp3")
+
+    def _get(self, key: str, dest: str) -> bool:
+        if not os.path.exists(self._path(key)):
+            return False
+        shutil.copyfile(self._path(key), dest)
+        return True
+
+    def _put(self, key: str, src: str):
+        tmp = f"{self._path(key)}.{os.getpid()}.part"
+        shutil.copyfile(src, tmp)
+        os.replace(tmp, self._path(key))
+
+    async def get(self, key: str, dest: str) -> bool:
+        return await asyncio.to_thread(self._get, key, dest)
+
+    async def put(self, key: str, src: str):
+        await asyncio.to_thread(self._put, key, src)
+
+
+class SupabaseTTSStore:
+    """
+    Clips under tts_cache/ in the Supabase storage bucket (pooled async client).
+    The bucket is public: cached clips are readable by URL like job audio.
+    """
+
+    def __init__(self):
+        # Imported lazily: supabase_utils refuses to import without credentials
+        from app.utils import supabase_utils
+        self._sb = supabase_utils
+
+    def _object(self, key: str) -> str:
+        return f"{TTS_SHARED_PREFIX}/{key}.mp3"
+
+    async def get(self, key: str, dest: str) -> bool:
+        try:
+            bucket = self._sb.get_async_supabase().storage.from_(self._sb.SUPABASE_BUCKET)
+            data = await bucket.download(self._object(key))
+        except Exception:
+            return False  # not found (or storage hiccup) → synthesize instead
+        if not data:
+            return False
+        with open(dest, "wb") as f:
+            f.write(data)
+        return True
+
+    async def put(self, key: str, src: str):
+        await self._sb.supabase_upload_async(src, self._object(key), "audio/mpeg")
+
+
+def _make_shared_store():
+    kind = TTS_SHARED_CACHE.strip()
+    try:
+        if kind == "supabase":
+            return SupabaseTTSStore()
+        if kind.startswith("dir:"):
+            return DirTTSStore(kind[len("dir:"):])
+    except Exception as e:
+        print(f"⚠ Shared TTS cache disabled ({kind}): {e}")
+    return None
+
+
+shared_store = _make_shared_store()
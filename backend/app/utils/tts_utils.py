@@ -6,21 +6,46 @@ Optimized for:
  - Hinglish Support (hi-IN-MadhurNeural)
  - Async Execution
  - Accurate Duration Calculation
+ - Sentence-level streaming: sentences synthesize concurrently and stream
+   straight to disk; durations come from the stream, not an MP3 decode
 """
 
 import os
+import re
+import time
+import uuid
+import asyncio
 import hashlib
 import shutil
 import edge_tts
 from pydub import AudioSegment
 from app.config import TTS_CACHE_DIR
+from app.utils.tts_cache_utils import (
+    tts_cache_lookup, tts_cache_store, tts_cache_count_shared_hit, shared_store
+)
+from app.utils.metrics_utils import stage_span
+from app.utils.audio_utils import silence_clip
 
 # ============================================================
 # CONFIGURATION
 # ============================================================
 # Best voice for Hinglish: "hi-IN-MadhurNeural"
 # Best voice for English: "en-US-ChristopherNeural"
-VOICE = "hi-IN-MadhurNeural" 
+VOICE = os.getenv("TTS_VOICE", "hi-IN-MadhurNeural")
+TTS_RATE = os.getenv("TTS_RATE", "+0%")
+
+# ⚡ Max concurrent Edge-TTS websocket sessions per job (sentences of every
+# scene share this cap) + per-scene retries
+TTS_CONCURRENCY = int(os.getenv("TTS_CONCURRENCY", 6))
+TTS_MAX_RETRIES = int(os.getenv("TTS_MAX_RETRIES", 3))
+
+# ⚡ Split segments into sentences and stream them concurrently
+TTS_SENTENCE_MODE = os.getenv("TTS_SENTENCE_MODE", "true").lower() == "true"
+TTS_MIN_SENTENCE_CHARS = int(os.getenv("TTS_MIN_SENTENCE_CHARS", 40))
+
+# Edge-TTS always returns audio-24khz-48kbitrate-mono-mp3 (CBR)
+_EDGE_BYTES_PER_SEC = 48000 / 8
+_TICKS_PER_SEC = 10_000_000  # WordBoundary offsets are in 100 ns units
 
 # ============================================================
 # 1. FFmpeg Safety Check
@@ -39,14 +64,143 @@ def _duration(path: str) -> float:
     except:
         return 0.0
 
+# ============================================================
+# 2b. Sentence streaming (no decode)
+# ============================================================
+_SENTENCE_END = re.compile(r"(?<=[.!?।…])\s+")
+
+def split_sentences(text: str) -> list:
+    """
+    Splits on sentence punctuation (incl. Devanagari danda); fragments
+    shorter than TTS_MIN_SENTENCE_CHARS are merged into the next one so
+    every Edge-TTS session carries a useful amount of speech.
+    """
+    sentences, buf = [], ""
+    for part in _SENTENCE_END.split(text.strip()):
+        buf = f"{buf} {part}".strip() if buf else part.strip()
+        if len(buf) >= TTS_MIN_SENTENCE_CHARS:
+            sentences.append(buf)
+            buf = ""
+    if buf:
+        if sentences and len(buf) < TTS_MIN_SENTENCE_CHARS:
+            sentences[-1] = f"{sentences[-1]} {buf}"
+        else:
+            sentences.append(buf)
+    return sentences
+
+def _group_sentences(sentences: list, max_parts: int) -> list:
+    """Joins neighbouring sentences into at most max_parts chunks of similar length."""
+    if len(sentences) <= max_parts:
+        return sentences
+    total = sum(len(s) for s in sentences)
+    groups, done = [[] for _ in range(max_parts)], 0
+    for sentence in sentences:
+        groups[min(max_parts - 1, done * max_parts // total)].append(sentence)
+        done += len(sentence)
+    return [" ".join(g) for g in groups if g]
+
+async def _stream_to_file(text: str, path: str, started: float, timings: dict) -> float:
+    """
+    Streams one Edge-TTS session into `path` chunk by chunk.
+    Duration = max(end of the last word boundary, CBR byte length) —
+    boundaries miss trailing silence, bytes are exact for CBR MP3.
+    """
+    communicate = edge_tts.Communicate(text, VOICE, rate=TTS_RATE, boundary="WordBoundary")
+    audio_bytes, spoken_end = 0, 0.0
+    with open(path, "wb") as f:
+        async for chunk in communicate.stream():
+            if chunk["type"] == "audio":
+                if "first_audio" not in timings:
+                    timings["first_audio"] = round(time.perf_counter() - started, 3)
+                f.write(chunk["data"])
+                audio_bytes += len(chunk["data"])
+            elif chunk["type"] in ("WordBoundary", "SentenceBoundary"):
+                spoken_end = max(spoken_end, (chunk["offset"] + chunk["duration"]) / _TICKS_PER_SEC)
+    return max(spoken_end, audio_bytes / _EDGE_BYTES_PER_SEC)
+
+async def _synthesize_sentences(clean_text: str, out_path: str, sessions: asyncio.Semaphore,
+                                max_parts: int = None) -> float:
+    """
+    Sentences stream concurrently into their own parts; the parts are then
+    appended in order (MP3 frames concatenate byte-wise) into `out_path`.
+    Every Edge-TTS session holds `sessions`, so the cap is on real websockets.
+    `max_parts` merges sentences into fewer sessions when the batch already
+    fills the cap (each extra session only adds a time-to-first-byte).
+    Returns the clip duration in seconds.
+    """
+    sentences = split_sentences(clean_text) if TTS_SENTENCE_MODE else [clean_text]
+    if max_parts:
+        sentences = _group_sentences(sentences, max_parts)
+    parts = [f"{out_path}.{i}" for i in range(len(sentences))]
+    started, timings = time.perf_counter(), {}
+
+    async def _bounded(sentence, part):
+        async with sessions:
+            return await _stream_to_file(sentence, part, started, timings)
+
+    try:
+        durations = await asyncio.gather(*[
+            _bounded(sentence, part) for sentence, part in zip(sentences, parts)
+        ])
+        with open(out_path, "wb") as out:
+            for part in parts:
+                with open(part, "rb") as f:
+                    shutil.copyfileobj(f, out)
+    finally:
+        for part in parts:
+            if os.path.exists(part):
+                os.remove(part)
+
+    print(f"   ↳ {len(sentences)} sentences, first audio after {timings.get('first_audio', 0)}s")
+    return round(sum(durations), 2)
+
+def tts_cache_key(clean_text: str, voice: str = None, rate: str = None) -> str:
+    """Voice and rate change the audio, so they are part of the key."""
+    raw = f"{voice or VOICE}|{rate or TTS_RATE}|{clean_text}"
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+async def _fetch_shared(key: str, final_path: str):
+    """Tier 2: pull a clip another replica already synthesized."""
+    if shared_store is None:
+        return None
+    tmp_path = f"{final_path}.{uuid.uuid4().hex}.part"
+    try:
+        if not await shared_store.get(key, tmp_path):
+            return None
+        os.replace(tmp_path, final_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    dur = _duration(final_path)
+    if dur <= 0.2:
+        return None
+    tts_cache_store(key, final_path, dur, VOICE)
+    tts_cache_count_shared_hit()
+    print(f"✔ Shared-cache Neural Audio ({dur}s)")
+    return final_path, dur
+
+async def _publish_shared(key: str, final_path: str):
+    if shared_store is None:
+        return
+    try:
+        await shared_store.put(key, final_path)
+    except Exception as e:
+        print(f"⚠ Shared TTS cache upload failed: {e}")
+
 # ============================================================
 # 3. MAIN FUNCTION — Neural TTS (Async)
 # ============================================================
-async def generate_narration_audio(text: str) -> tuple[str, float]:
+async def generate_narration_audio(text: str, sessions: asyncio.Semaphore = None,
+                                   max_parts: int = None) -> tuple[str, float]:
     """
     Generates high-quality Neural audio.
     NOTE: This is now an ASYNC function.
+    `sessions` caps concurrent Edge-TTS websockets (shared across a batch),
+    `max_parts` the sessions this clip splits into (see _synthesize_sentences).
     """
+    if sessions is None:
+        sessions = asyncio.Semaphore(TTS_CONCURRENCY)
     _assert_ffmpeg_exists()
     os.makedirs(TTS_CACHE_DIR, exist_ok=True)
 
@@ -55,16 +209,23 @@ async def generate_narration_audio(text: str) -> tuple[str, float]:
     if not clean_text:
         return "", 0.0
 
-    # Cache Key
-    text_hash = hashlib.md5(clean_text.encode()).hexdigest()
+    # Cache Key (voice + rate + text)
+    text_hash = tts_cache_key(clean_text)
     final_path = os.path.join(TTS_CACHE_DIR, f"{text_hash}.mp3")
 
     # ------------------------------------------------------------
-    # CHECK CACHE
+    # CHECK CACHE (⚡ indexed: duration comes from the index, no decode)
     # ------------------------------------------------------------
+    hit = tts_cache_lookup(text_hash)
+    if hit:
+        print(f"✔ Cached Neural Audio ({hit[1]}s)")
+        return hit
+
     if os.path.exists(final_path):
+        # Clip on disk but not in the index (index reset): decode once, then index it
         dur = _duration(final_path)
         if dur > 0.2:
+            tts_cache_store(text_hash, final_path, dur, VOICE)
             print(f"✔ Cached Neural Audio ({dur}s)")
             return final_path, dur
         else:
@@ -73,22 +234,72 @@ async def generate_narration_audio(text: str) -> tuple[str, float]:
             except:
                 pass
 
+    hit = await _fetch_shared(text_hash, final_path)
+    if hit:
+        return hit
+
     # ------------------------------------------------------------
-    # GENERATE NEW AUDIO (Edge TTS)
+    # GENERATE NEW AUDIO (Edge TTS) — retried before falling back
     # ------------------------------------------------------------
     print(f"🎤 Generating Neural TTS ({len(clean_text)} chars)...")
-    
-    try:
-        communicate = edge_tts.Communicate(clean_text, VOICE)
-        await communicate.save(final_path)
 
-        dur = _duration(final_path)
-        print(f"✔ Final TTS generated → {dur}s")
-        return final_path, dur
+    for attempt in range(1, TTS_MAX_RETRIES + 1):
+        # Write to a private temp file, then rename: concurrent jobs never
+        # see (or cache) a half-written MP3
+        tmp_path = f"{final_path}.{uuid.uuid4().hex}.part"
+        try:
+            with stage_span("tts_clip", items=1) as span:
+                dur = await _synthesize_sentences(clean_text, tmp_path, sessions, max_parts)
+                span["bytes"] = os.path.getsize(tmp_path)
+            os.replace(tmp_path, final_path)
 
-    except Exception as e:
-        print(f"❌ EdgeTTS Failed: {e}")
-        # Fallback to silence if generation fails
-        fallback = os.path.join(TTS_CACHE_DIR, f"{text_hash}_fallback.mp3")
-        AudioSegment.silent(duration=1000).export(fallback, format="mp3")
-        return fallback, 1.0
\ No newline at end of file
+            if dur > 0.2:
+                tts_cache_store(text_hash, final_path, dur, VOICE)
+                await _publish_shared(text_hash, final_path)
+            print(f"✔ Final TTS generated → {dur}s")
+            return final_path, dur
+
+        except Exception as e:
+            print(f"❌ EdgeTTS Failed (attempt {attempt}/{TTS_MAX_RETRIES}): {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            if attempt < TTS_MAX_RETRIES:
+                await asyncio.sleep(0.5 * 2 ** (attempt - 1))
+
+    # Fallback to silence if every attempt failed — the shared 24 kHz mono
+    # clip, so the concat step never has to resample it
+    return await silence_clip(1.0), 1.0
+
+# ============================================================
+# 4. BATCH — all scenes concurrently, results in input order
+# ============================================================
+async def generate_narration_batch(texts: list, on_clip=None) -> list:
+    """
+    Synthesizes every text with at most TTS_CONCURRENCY Edge-TTS sessions
+    open at once — counted per sentence, not per scene, so long scenes do
+    not multiply the load. Identical lines are synthesized once. Returns [(path, duration)] in
+    the same order as `texts` (("", 0.0) for empty text).
+    Scenes split into sentences only as far as the cap leaves room: with
+    more scenes than sessions each scene is one session.
+    on_clip(index, path, duration) is awaited as soon as each clip is ready.
+    """
+    sessions = asyncio.Semaphore(TTS_CONCURRENCY)
+    pending = {}
+    indices = {}
+    for i, text in enumerate(texts):
+        indices.setdefault(text, []).append(i)
+    max_parts = max(1, TTS_CONCURRENCY // max(1, sum(1 for t in indices if t.strip())))
+
+    async def _one(text):
+        result = await generate_narration_audio(text, sessions, max_parts)
+        if on_clip is not None:
+            for i in indices[text]:
+                await on_clip(i, *result)
+        return result
+
+    for text in texts:
+        if text not in pending:
+            pending[text] = asyncio.ensure_future(_one(text))
+
+    await asyncio.gather(*pending.values())
+    return [pending[text].result() for text in texts]
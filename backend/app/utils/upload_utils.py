@@ -0,0 +1,105 @@
+# backend/app/utils/upload_utils.py
+
+import os
+import re
+import time
+import hashlib
+import tempfile
+from typing import NamedTuple
+from fastapi import UploadFile
+from app.config import TEMP_DIR
+
+# -------------------------------------------------------------
+# CONFIGURATION
+# -------------------------------------------------------------
+# ⚡ Peak memory per upload request ≈ one chunk, whatever the PDF size
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", 1024 * 1024))  # 1 MB
+UPLOAD_RETENTION_SECONDS = int(os.getenv("UPLOAD_RETENTION_SECONDS", 6 * 3600))
+
+# Content-addressed local copies: uploads/<sha256>.pdf
+UPLOAD_DIR = os.path.join(TEMP_DIR, "uploads")
+os.makedirs(UPLOAD_DIR, exist_ok=True)
+
+# Page objects look like "/Type /Page" (but not "/Type /Pages")
+_PAGE_MARKER = re.compile(rb"/Type\s*/Page(?![a-zA-Z])")
+_MARKER_OVERLAP = 32
+
+
+class SpooledUpload(NamedTuple):
+    path: str
+    sha256: str
+    size: int
+    page_count: int
+
+
+def local_upload_path(sha256: str) -> str:
+    """Where a spooled upload with this content hash lives on disk."""
+    return os.path.join(UPLOAD_DIR, f"{sha256}.pdf")
+
+
+# -------------------------------------------------------------
+# Housekeeping: drop stale local copies
+# -------------------------------------------------------------
+def prune_uploads(max_age: int = UPLOAD_RETENTION_SECONDS) -> int:
+    removed = 0
+    cutoff = time.time() - max_age
+    for name in os.listdir(UPLOAD_DIR):
+        path = os.path.join(UPLOAD_DIR, name)
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+                removed += 1
+        except OSError:
+            continue
+    return removed
+
+
+# -------------------------------------------------------------
+# STREAM multipart body → disk (hash + page count on the fly)
+# -------------------------------------------------------------
+async def spool_upload(upload: UploadFile) -> SpooledUpload:
+    """
+    Streams an UploadFile to disk in fixed-size chunks.
+    Computes SHA-256 and a page count while the bytes go through,
+    so the whole PDF is never held in memory.
+
+    NOTE: page count is a "/Type /Page" marker scan — PDFs that hide
+    their page tree in compressed object streams report 0 here.
+    """
+    prune_uploads()
+
+    digest = hashlib.sha256()
+    size = 0
+    page_count = 0
+    tail = b""
+
+    fd, tmp_path = tempfile.mkstemp(dir=UPLOAD_DIR, suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = await upload.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                out.write(chunk)
+                digest.update(chunk)
+                size += len(chunk)
+
+                # Only count markers that start before the carried-over tail,
+                # so ones split across chunk boundaries are seen exactly once
+                window = tail + chunk
+                cut = max(len(window) - _MARKER_OVERLAP, 0)
+                page_count += sum(1 for m in _PAGE_MARKER.finditer(window) if m.start() < cut)
+                tail = window[cut:]
+
+            page_count += len(_PAGE_MARKER.findall(tail))
+
+        sha256 = digest.hexdigest()
+        final_path = local_upload_path(sha256)
+        os.replace(tmp_path, final_path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    print(f"✔ Spooled upload → {size / 1e6:.1f} MB | {page_count} pages | sha256 {sha256[:12]}")
+    return SpooledUpload(final_path, sha256, size, page_count)
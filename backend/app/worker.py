@@ -1,191 +1,587 @@
 from .celery_app import celery_app
+from celery import chain
+from celery.signals import worker_init, worker_process_init, worker_process_shutdown
 import asyncio
 import os
 import json
-import base64
-import requests
-import uuid
-import io
+import time
 import traceback
-from pydub import AudioSegment
-from groq import Groq
-from supabase import create_client
 
 # Import Utils
-from .utils.supabase_utils import supabase_upload
-from .utils.pdf_utils import extract_pdf_images_high_quality
-from .utils.tts_utils import generate_narration_audio
-from .utils.openai_utils import generate_cinematic_script
+from .utils.supabase_utils import supabase_upload_async, supabase_update_job_async, get_async_supabase
+from .utils.audio_utils import assemble_narration, AUDIO_SAMPLE_RATE, AUDIO_BITRATE
+from .utils.download_utils import download_pdf, http_session
+from .utils.pdf_utils import (
+    extract_pdf_images_high_quality, PANEL_DETECT_SCALE, PANEL_SEGMENTER,
+    STRIP_MIN_ASPECT, GUTTER_MIN_CONFIDENCE
+)
+from .utils.tts_utils import (
+    generate_narration_batch, VOICE, TTS_RATE, TTS_SENTENCE_MODE, TTS_MIN_SENTENCE_CHARS
+)
+from .utils.openai_utils import (
+    generate_cinematic_script, groq_chat, image_content, get_async_groq, GROQ_MODEL, PROMPT_VERSION,
+    SCRIPT_BATCH_SIZE, SCRIPT_CONCURRENCY
+)
+from .utils.cache_utils import (
+    get_cached_result, store_cached_result, drop_cached_result, count_result_lookup
+)
+from .utils.dedup_utils import dedupe_panels, PANEL_DEDUP_DISTANCE
+from .utils.encode_utils import (
+    encode_panels, JPEG_ENCODER, JPEG_QUALITY, JPEG_OPTIMIZE, JPEG_PROGRESSIVE
+)
+from .utils.progress_utils import ProgressReporter
+from .utils.job_store_utils import write_job_status
+from .utils.loop_utils import run_on_worker_loop, close_worker_loop, check_worker_pool
+from .utils.artifact_utils import (
+    job_dir, write_artifact, read_artifact, write_json_artifact, read_json_artifact,
+    adopt_file, remove_job_artifacts, sweep_stale_artifacts
+)
+from .utils.metrics_utils import (
+    stage_span, job_context, observe_job, start_worker_metrics, worker_process_exited
+)
 
 # -------------------------------------------------------------------
-# 0. SETUP CLIENTS
+# 0. SETUP
 # -------------------------------------------------------------------
-groq_client = Groq(api_key=os.environ.get("GROQ_API_KEY"))
-supabase = create_client(
-    os.getenv("SUPABASE_URL"), 
-    os.getenv("SUPABASE_SERVICE_ROLE_KEY") or os.getenv("SUPABASE_KEY")
-)
+# Storage / DB / Groq clients are pooled per worker process (loop_utils)
+
+PDF_DPI = int(os.getenv("PDF_DPI", 120))
+
+# Groq vision backfill concurrency (rate limiting lives in openai_utils)
+BACKFILL_CONCURRENCY = int(os.getenv("BACKFILL_CONCURRENCY", 4))
+
+# Upload each scene's clip as soon as it is ready (progressive playback)
+PUBLISH_SCENE_AUDIO = os.getenv("PUBLISH_SCENE_AUDIO", "true").lower() == "true"
+
+# "stages" = chained per-stage tasks on the CPU / I/O queues, "single" = one task per job
+PIPELINE_MODE = os.getenv("PIPELINE_MODE", "stages").lower()
+
+# Every setting besides the PDF bytes and genre that changes the final
+# result — the result-cache key is derived from this one dict, so a new
+# output-affecting setting only has to be added here
+OUTPUT_SETTINGS = {
+    # rasterize + panel detection
+    "dpi": PDF_DPI,
+    "segmenter": PANEL_SEGMENTER,
+    "detect_scale": PANEL_DETECT_SCALE,
+    "strip_min_aspect": STRIP_MIN_ASPECT,
+    "gutter_min_confidence": GUTTER_MIN_CONFIDENCE,
+    "dedup_distance": PANEL_DEDUP_DISTANCE,
+    # panel JPEGs
+    "jpeg_encoder": JPEG_ENCODER,
+    "jpeg_quality": JPEG_QUALITY,
+    "jpeg_optimize": JPEG_OPTIMIZE,
+    "jpeg_progressive": JPEG_PROGRESSIVE,
+    # script (batching + waves change what the model sees)
+    "model": GROQ_MODEL,
+    "prompt_version": PROMPT_VERSION,
+    "script_batch_size": SCRIPT_BATCH_SIZE,
+    "script_concurrency": SCRIPT_CONCURRENCY,
+    # narration audio
+    "voice": VOICE,
+    "tts_rate": TTS_RATE,
+    "tts_sentence_mode": TTS_SENTENCE_MODE,
+    "tts_min_sentence_chars": TTS_MIN_SENTENCE_CHARS,
+    "audio_sample_rate": AUDIO_SAMPLE_RATE,
+    "audio_bitrate": AUDIO_BITRATE,
+}
 
 # -------------------------------------------------------------------
 # 1. HELPER FUNCTIONS
 # -------------------------------------------------------------------
 
-async def upload_images_parallel(image_bytes, manga_folder):
+async def upload_images_parallel(panel_files, manga_folder, on_progress=None):
+    """panel_files: JPEG paths (streamed from disk by the storage client) or bytes."""
     semaphore = asyncio.Semaphore(5)
-    image_urls = [None] * len(image_bytes)
-    loop = asyncio.get_running_loop()
+    image_urls = [None] * len(panel_files)
 
     async def _upload(img, idx):
         async with semaphore:
             path = f"{manga_folder}/images/page_{idx:02d}.jpg"
-            url = await loop.run_in_executor(None, supabase_upload, img, path, "image/jpeg")
-            return idx, url
+            url = await supabase_upload_async(img, path, "image/jpeg")
+        if on_progress is not None:
+            done[0] += 1
+            await on_progress(done[0], len(panel_files))
+        return idx, url
 
-    tasks = [_upload(b, i) for i, b in enumerate(image_bytes)]
+    done = [0]
+    tasks = [_upload(b, i) for i, b in enumerate(panel_files)]
     results = await asyncio.gather(*tasks)
     
     for idx, url in results:
         image_urls[idx] = url
     return image_urls
 
-def generate_visual_description_sync(image_bytes):
+async def generate_visual_description_async(image_bytes):
+    """One rate-limited Groq vision call (429s are retried inside groq_chat)."""
+    prompt = "Describe this image in 1 energetic Hinglish sentence."
+    content = await groq_chat(
+        [{"type": "text", "text": prompt}, image_content(image_bytes)],
+        max_tokens=300,
+    )
+    if not content:
+        return "Scene aage badhta hai..."
+    return content.strip()
+
+async def describe_panels_concurrently(image_bytes, indices):
+    """Bounded-concurrency backfill; returns {panel_index: description}."""
+    semaphore = asyncio.Semaphore(BACKFILL_CONCURRENCY)
+
+    async def _describe(idx):
+        async with semaphore:
+            return idx, await generate_visual_description_async(image_bytes[idx])
+
+    results = await asyncio.gather(*[_describe(i) for i in indices])
+    return dict(results)
+
+def _result_cache_settings(manga_genre):
+    """Everything besides the PDF bytes that changes the final result."""
+    return {**OUTPUT_SETTINGS, "genre": manga_genre.strip().lower()}
+
+async def _lookup_cached_result(pdf_sha256, settings):
+    """Cache hit only counts if the cached result.json is still reachable."""
+    cached = get_cached_result(pdf_sha256, settings)
+    if not cached:
+        count_result_lookup(hit=False)
+        return None
     try:
-        base64_image = base64.b64encode(image_bytes).decode('utf-8')
-        prompt = "Describe this image in 1 energetic Hinglish sentence."
-        
-        chat_completion = groq_client.chat.completions.create(
-            messages=[{
-                "role": "user", 
-                "content": [
-                    {"type": "text", "text": prompt},
-                    {"type": "image_url", "image_url": {"url": f"data:image/jpeg;base64,{base64_image}"}}
-                ]
-            }],
-            model="meta-llama/llama-4-scout-17b-16e-instruct",
-            temperature=0.6,
-            max_tokens=300,
-        )
-        return chat_completion.choices[0].message.content.strip()
+        # Blocking requests HEAD → worker thread, the loop keeps serving other coroutines
+        resp = await asyncio.to_thread(http_session.head, cached["result_url"], timeout=10)
+        if resp.status_code == 200:
+            count_result_lookup(hit=True)
+            return cached
     except Exception as e:
-        print(f"❌ Groq Vision Error: {e}")
-        return "Scene aage badhta hai..."
+        print(f"⚠ Cached result check failed: {e}")
+    drop_cached_result(pdf_sha256, settings)
+    count_result_lookup(hit=False)
+    return None
 
 # -------------------------------------------------------------------
-# 2. ASYNC LOGIC
+# 2. PIPELINE STAGES
 # -------------------------------------------------------------------
-async def _process_task_async(task_id, manga_name, manga_genre, pdf_url):
-    print(f"🚀 Starting Task: {task_id} | Manga: {manga_name}")
-    
+# Each stage takes and returns `job`: a small JSON dict (ids, panel
+# mapping, URLs, artifact paths) that travels through the broker. Panel
+# JPEGs, the script, TTS clips and the progress snapshot stay in the job's
+# artifact directory and are passed by path (artifact_utils).
+# A result-cache hit in the first stage sets job["cached"]; later stages
+# then pass the job through untouched.
+
+def _scene_audio_publisher(progress, manga_folder, total):
+    """on_clip callback: upload each distinct clip once, then record it on the manifest."""
+    uploads = {}
+    done = [0]
+
+    async def _on_clip(index, path, dur):
+        if not path:
+            await progress.scene_audio(index, None, 2.0)  # silence
+        else:
+            url = None
+            if PUBLISH_SCENE_AUDIO:
+                if path not in uploads:
+                    uploads[path] = asyncio.ensure_future(supabase_upload_async(
+                        path, f"{manga_folder}/audio/{os.path.basename(path)}", "audio/mpeg"
+                    ))
+                try:
+                    url = await uploads[path]
+                except Exception as e:
+                    print(f"⚠ Scene audio upload failed: {e}")
+            await progress.scene_audio(index, url, dur)
+        done[0] += 1
+        await progress.advance(done[0], total)
+
+    return _on_clip
+
+def _new_job(task_id, manga_name, manga_genre, pdf_url, pdf_sha256=None):
+    return {
+        "task_id": task_id,
+        "manga_name": manga_name,
+        "manga_genre": manga_genre,
+        "pdf_url": pdf_url,
+        "pdf_sha256": pdf_sha256,
+        "manga_folder": f"{manga_name.replace(' ', '_').lower()}_{str(task_id)[:8]}",
+        "cached": False,
+    }
+
+async def _update_job(job, fields):
+    """Supabase jobs row first, then the local job store (routers/status.py listing)."""
+    await supabase_update_job_async(job["task_id"], fields)
+    try:
+        write_job_status(job["task_id"], {"job_id": str(job["task_id"]), "manga_name": job["manga_name"], **fields})
+    except Exception as e:
+        print(f"⚠ Job store write failed: {e}")
+
+def _manifest_path(job):
+    return f"{job['manga_folder']}/manifest.json"
+
+async def _stage_extract(job, progress):
+    """CPU: download, rasterize + detect, dedup, JPEG encode → panel files."""
+    task_id = job["task_id"]
+    print(f"🚀 Starting Task: {task_id} | Manga: {job['manga_name']}")
+    cache_settings = _result_cache_settings(job["manga_genre"])
+    pdf_sha256 = job["pdf_sha256"]
+    temp_pdf = None
+
     try:
-        # 1. Download PDF
-        print("⬇️ Downloading PDF...")
-        resp = requests.get(pdf_url)
-        if resp.status_code != 200: raise ValueError("Failed to download PDF")
+        # 0. ⚡ Result cache: same PDF + same settings → reuse the finished job
+        with stage_span("cache_lookup"):
+            cached = await _lookup_cached_result(pdf_sha256, cache_settings) if pdf_sha256 else None
 
-        temp_pdf = f"/tmp/{uuid.uuid4()}.pdf"
-        with open(temp_pdf, "wb") as f:
-            f.write(resp.content)
+        if not cached:
+            # 1. Download PDF (⚡ streamed + pooled, skipped if a local copy matches the hash)
+            print("⬇️ Downloading PDF...")
+            await progress.stage("downloading")
+            known_hash = pdf_sha256
+            with stage_span("download", items=1) as span:
+                temp_pdf, pdf_sha256 = await asyncio.to_thread(download_pdf, job["pdf_url"], pdf_sha256)
+                span["bytes"] = os.path.getsize(temp_pdf)
+            job["pdf_sha256"] = pdf_sha256
+            if pdf_sha256 != known_hash:
+                cached = await _lookup_cached_result(pdf_sha256, cache_settings)
+
+        if cached:
+            print(f"⚡ Result cache HIT (sha256 {pdf_sha256[:12]}) — skipping pipeline")
+            await _update_job(job, {
+                "status": "SUCCESS",
+                "result_url": cached["result_url"]
+            })
+            await progress.complete({"result_url": cached["result_url"], "image_urls": cached.get("image_urls", []),
+                                     "audio_url": cached.get("audio_url")})
+            job["cached"] = True
+            return job
 
         # 2. Extract Images
         print("🖼️ Extracting Images...")
-        images = extract_pdf_images_high_quality(temp_pdf)
+        await progress.stage("extracting")
+        with stage_span("extract") as span:  # = rasterize + detect spans (pdf_utils)
+            # Off the loop: the worker's heartbeat, progress publishes and
+            # pooled connections stay serviced while pages rasterize
+            images = await asyncio.to_thread(extract_pdf_images_high_quality, temp_pdf, dpi=PDF_DPI)
+            span["items"] = len(images)
         if not images: raise ValueError("No images extracted")
 
-        image_bytes = []
-        for img in images:
-            buf = io.BytesIO()
-            img.save(buf, format="JPEG", quality=75, optimize=True)
-            image_bytes.append(buf.getvalue())
-
-        # 3. Upload Images
-        str_id = str(task_id)
-        manga_folder = f"{manga_name.replace(' ', '_').lower()}_{str_id[:8]}"
-        image_urls = await upload_images_parallel(image_bytes, manga_folder)
-
-        # 4. Generate Script
-        print("📝 Generating Script...")
-        llm_output = generate_cinematic_script(manga_name, manga_genre, "", image_bytes[:4])
-        scenes = llm_output.get("scenes", [])
-
-        # 5. Backfill Scenes
-        if len(scenes) < len(image_urls):
-            print("⚠️ Filling missing scenes...")
-            for i in range(len(scenes), len(image_urls)):
-                desc = generate_visual_description_sync(image_bytes[i])
-                scenes.append({
-                    "narration_segment": desc,
-                    "image_page_index": i,
-                    "duration": 4.0
-                })
-
-        # 6. Generate Audio
-        print("🎤 Generating Audio...")
-        merged_audio = AudioSegment.empty()
-        final_scenes = []
-        timeline = 0.0
-
-        for sc in scenes:
-            text = sc.get("narration_segment", "").strip()
-            if text:
-                path, dur = await generate_narration_audio(text) 
-                merged_audio += AudioSegment.from_mp3(path)
-            else:
-                dur = 2.0
-                merged_audio += AudioSegment.silent(duration=2000)
-            
-            sc["start_time"] = round(timeline, 2)
-            sc["duration"] = round(dur, 2)
-            timeline += dur
-            final_scenes.append(sc)
-
-        # 7. Upload Audio
-        buf = io.BytesIO()
-        merged_audio.export(buf, format="mp3")
-        audio_url = supabase_upload(buf.getvalue(), f"{manga_folder}/audio.mp3", "audio/mpeg")
-
-        # 8. Save Result
-        final_result = {
-            "task_id": task_id,
-            "status": "SUCCESS",
-            "manga_name": manga_name,
-            "image_urls": image_urls,
-            "audio_url": audio_url,
-            "final_video_segments": final_scenes,
-            "total_duration": round(timeline, 2)
-        }
-        res_url = supabase_upload(json.dumps(final_result).encode(), f"{manga_folder}/result.json", "application/json")
-
-        # 9. Update DB
-        print("🔹 Updating Database...")
-        supabase.table("jobs").update({
-            "status": "SUCCESS",
-            "result_url": res_url
-        }).eq("id", task_id).execute()
-
-        print("✅ Task Completed Successfully")
-        return {"status": "ok"}
+        # ⚡ Near-duplicate panels share the canonical panel's JPEG, URL and description
+        with stage_span("dedup", items=len(images)):
+            canonical = dedupe_panels(images)
+            unique_idx = sorted(set(canonical))
+
+        # ⚡ JPEG encode across a thread pool, off the event loop
+        with stage_span("encode", items=len(unique_idx)) as span:
+            jpegs = await asyncio.to_thread(encode_panels, [images[i] for i in unique_idx])
+            span["bytes"] = sum(len(j) for j in jpegs)
+
+        job["canonical"] = canonical
+        job["unique_idx"] = unique_idx
+        job["panels"] = [
+            write_artifact(task_id, f"panels/page_{n:02d}.jpg", jpeg) for n, jpeg in enumerate(jpegs)
+        ]
+        return job
+    finally:
+        if temp_pdf and os.path.exists(temp_pdf):
+            os.remove(temp_pdf)
+
+async def _stage_upload_panels(job, progress):
+    """I/O: unique panels → storage, streamed from the panel files."""
+    if job["cached"]:
+        return job
+    unique_idx, canonical = job["unique_idx"], job["canonical"]
+
+    # 3. Upload Images (unique panels only)
+    await progress.stage("uploading_panels")
+    nbytes = sum(os.path.getsize(p) for p in job["panels"])
+    with stage_span("upload_panels", items=len(unique_idx), nbytes=nbytes):
+        unique_urls = await upload_images_parallel(
+            job["panels"], job["manga_folder"], on_progress=progress.advance
+        )
+    url_by_panel = dict(zip(unique_idx, unique_urls))
+    job["image_urls"] = [url_by_panel[c] for c in canonical]
+    await progress.panels(job["image_urls"])
+    return job
+
+async def _stage_script(job, progress):
+    """I/O: Groq script over the unique panels + backfill → scenes.json."""
+    if job["cached"]:
+        return job
+    unique_idx, canonical = job["unique_idx"], job["canonical"]
+    encoded = {i: read_artifact(p) for i, p in zip(unique_idx, job["panels"])}
+
+    # 4. Generate Script (⚡ batched over every unique panel, scenes published per wave)
+    print("📝 Generating Script...")
+    await progress.stage("scripting")
+
+    async def _on_scenes(wave_scenes, panels_done):
+        await progress.scenes([
+            {**sc, "image_page_index": unique_idx[sc["image_page_index"]]}
+            for sc in wave_scenes if 0 <= sc["image_page_index"] < len(unique_idx)
+        ])
+        await progress.advance(panels_done, len(unique_idx))
 
+    with stage_span("script", items=len(unique_idx)):
+        llm_output = await generate_cinematic_script(
+            job["manga_name"], job["manga_genre"], "", [encoded[i] for i in unique_idx], on_scenes=_on_scenes
+        )
+    # Script indices point into the unique-panel list → map back to panel indices
+    by_index = {}
+    for sc in llm_output.get("scenes", []):
+        k = sc.get("image_page_index")
+        if isinstance(k, int) and 0 <= k < len(unique_idx):
+            sc["image_page_index"] = unique_idx[k]
+            by_index.setdefault(unique_idx[k], sc)
+
+    # 5. Backfill Scenes (failed batches + duplicate panels)
+    missing = [i for i in range(len(canonical)) if i not in by_index]
+    if missing:
+        print(f"⚠️ Filling {len(missing)} missing scenes...")
+        described = {i: sc.get("narration_segment", "") for i, sc in by_index.items()}
+        # ⚡ One concurrent, rate-limited Groq call per canonical panel without a description
+        to_describe = sorted({canonical[i] for i in missing if not described.get(canonical[i])})
+        with stage_span("backfill", items=len(to_describe)):
+            described.update(await describe_panels_concurrently(encoded, to_describe))
+
+        for i in missing:
+            by_index[i] = {
+                "narration_segment": described[canonical[i]],
+                "image_page_index": i,
+                "duration": 4.0
+            }
+
+    scenes = [by_index[i] for i in range(len(canonical))]
+    await progress.scenes(scenes)
+    job["scenes"] = write_json_artifact(job["task_id"], "scenes.json", scenes)
+    return job
+
+async def _stage_narrate(job, progress):
+    """I/O: Edge-TTS for every scene → clip files in the job's artifacts."""
+    if job["cached"]:
+        return job
+    scenes = read_json_artifact(job["scenes"])
+
+    # 6. Generate Audio (⚡ all scenes concurrently, timeline built afterwards in order)
+    print("🎤 Generating Audio...")
+    await progress.stage("narrating")
+    texts = [sc.get("narration_segment", "").strip() for sc in scenes]
+    with stage_span("tts", items=len(texts)):
+        clips = await generate_narration_batch(
+            texts, on_clip=_scene_audio_publisher(progress, job["manga_folder"], len(scenes))
+        )
+
+    # Clips sit in this worker's TTS cache → hand them on by reference (None = silence)
+    job["clips"] = [
+        [adopt_file(job["task_id"], f"audio/{os.path.basename(path)}", path) if (text and path) else None, dur]
+        for text, (path, dur) in zip(texts, clips)
+    ]
+    return job
+
+async def _stage_assemble(job, progress):
+    """CPU: timeline + one ffmpeg encode, then the final uploads and DB update."""
+    if job["cached"]:
+        return job
+    task_id = job["task_id"]
+    scenes = read_json_artifact(job["scenes"])
+
+    track = []
+    final_scenes = []
+    timeline = 0.0
+
+    for sc, (path, dur) in zip(scenes, job["clips"]):
+        if not path:
+            dur = 2.0   # silence
+        track.append((path, dur))
+
+        sc["start_time"] = round(timeline, 2)
+        sc["duration"] = round(dur, 2)
+        timeline += dur
+        final_scenes.append(sc)
+
+    narration_path = None
+    try:
+        # 7. Assemble + Upload Audio (⚡ one ffmpeg concat pass, streamed from disk)
+        await progress.stage("assembling")
+        with stage_span("assemble", items=len(track)) as span:
+            narration_path = await assemble_narration(track)
+            span["bytes"] = os.path.getsize(narration_path)
+        with stage_span("upload_audio", items=1, nbytes=span["bytes"]):
+            audio_url = await supabase_upload_async(
+                narration_path, f"{job['manga_folder']}/audio.mp3", "audio/mpeg"
+            )
+    finally:
+        if narration_path and os.path.exists(narration_path):
+            os.remove(narration_path)
+
+    # 8. Save Result
+    await progress.stage("finalizing")
+    final_result = {
+        "task_id": task_id,
+        "status": "SUCCESS",
+        "manga_name": job["manga_name"],
+        "image_urls": job["image_urls"],
+        "audio_url": audio_url,
+        "final_video_segments": final_scenes,
+        "total_duration": round(timeline, 2)
+    }
+    with stage_span("upload_result", items=1):
+        res_url = await supabase_upload_async(
+            json.dumps(final_result).encode(), f"{job['manga_folder']}/result.json", "application/json"
+        )
+    store_cached_result(job["pdf_sha256"], _result_cache_settings(job["manga_genre"]), {
+        "result_url": res_url,
+        "image_urls": job["image_urls"],
+        "audio_url": audio_url,
+        "source_task_id": str(task_id)
+    })
+
+    # 9. Update DB
+    print("🔹 Updating Database...")
+    await _update_job(job, {
+        "status": "SUCCESS",
+        "result_url": res_url
+    })
+
+    # SUCCESS goes out last: a client that sees it can rely on the jobs row
+    await progress.complete({**final_result, "result_url": res_url})
+    print("✅ Task Completed Successfully")
+    return job
+
+PIPELINE_STAGES = [_stage_extract, _stage_upload_panels, _stage_script, _stage_narrate, _stage_assemble]
+
+async def _fail_job(job, progress, error):
+    print(f"❌ Worker Failed: {error}")
+    traceback.print_exc()
+    if job["task_id"]:
+        await _update_job(job, {"status": "FAILED", "message": str(error)})
+    await progress.fail(str(error))
+
+async def _process_task_async(task_id, manga_name, manga_genre, pdf_url, pdf_sha256=None, celery_task=None):
+    """Every stage in one event loop (PIPELINE_MODE=single, benchmarks)."""
+    job = _new_job(task_id, manga_name, manga_genre, pdf_url, pdf_sha256)
+    # ⚡ Partial results: stage/percent in the result backend, growing manifest in storage
+    progress = ProgressReporter(task_id, _manifest_path(job), celery_task)
+
+    try:
+        for stage in PIPELINE_STAGES:
+            job = await stage(job, progress)
+        return {"status": "ok", "cached": True} if job["cached"] else {"status": "ok"}
     except Exception as e:
-        print(f"❌ Worker Failed: {e}")
-        traceback.print_exc()
-        if task_id:
-            supabase.table("jobs").update({"status": "FAILED"}).eq("id", task_id).execute()
+        await _fail_job(job, progress, e)
         raise e
     finally:
-        if 'temp_pdf' in locals() and os.path.exists(temp_pdf):
-            os.remove(temp_pdf)
+        remove_job_artifacts(task_id)
 
 # -------------------------------------------------------------------
-# 3. CELERY TASK
+# 3. CELERY TASKS
 # -------------------------------------------------------------------
+# "stages": one task per stage, chained and routed to the CPU / I/O queues
+# (celery_app.task_routes), so each pool scales on its own.
+# "single": the whole job in one task, for a single catch-all worker.
+
 @celery_app.task(bind=True, name="process_manga_pdf")
-def process_manga_pdf_task(self, task_id, manga_name, manga_genre, pdf_url):
+def process_manga_pdf_task(self, task_id, manga_name, manga_genre, pdf_url, pdf_sha256=None):
     """
-    Celery Wrapper: Runs the async logic in a sync loop
+    Celery Wrapper: Runs the async logic on the worker's persistent loop
     """
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
+    start = time.perf_counter()
+    outcome = "failed"
     try:
-        return loop.run_until_complete(_process_task_async(task_id, manga_name, manga_genre, pdf_url))
+        with job_context(task_id):
+            result = run_on_worker_loop(
+                _process_task_async(task_id, manga_name, manga_genre, pdf_url, pdf_sha256, celery_task=self)
+            )
+        outcome = "cached" if result.get("cached") else "success"
+        return result
     finally:
-        loop.close()
\ No newline at end of file
+        observe_job(outcome, time.perf_counter() - start)
+
+def _run_stage(celery_task, stage, job, final=False):
+    """
+    One stage on the worker's loop. Progress state is resumed from and saved to
+    the job's artifacts, so consecutive stages may run on different workers.
+    """
+    task_id = job["task_id"]
+    job.setdefault("started_at", time.time())
+    progress_path = os.path.join(job_dir(task_id), "progress.json")
+    progress = ProgressReporter.resume(
+        task_id, _manifest_path(job), read_json_artifact(progress_path), celery_task
+    )
+    try:
+        with job_context(task_id):
+            job = run_on_worker_loop(stage(job, progress))
+        if final:
+            observe_job("cached" if job["cached"] else "success", time.time() - job["started_at"])
+            remove_job_artifacts(task_id)
+        else:
+            write_json_artifact(task_id, "progress.json", progress.snapshot())
+        return job
+    except Exception as e:
+        with job_context(task_id):
+            run_on_worker_loop(_fail_job(job, progress, e))
+        if celery_task.request.id != str(task_id):
+            # The chain stops here — its last task (which carries the job's id) never runs
+            try:
+                celery_task.backend.mark_as_failure(str(task_id), e)
+            except Exception as backend_error:
+                print(f"⚠ Could not record failure for {task_id}: {backend_error}")
+        observe_job("failed", time.time() - job["started_at"])
+        remove_job_artifacts(task_id)
+        raise
+
+@celery_app.task(bind=True, name="pipeline.extract", ignore_result=True)
+def extract_stage_task(self, job):
+    return _run_stage(self, _stage_extract, job)
+
+@celery_app.task(bind=True, name="pipeline.upload_panels", ignore_result=True)
+def upload_panels_stage_task(self, job):
+    return _run_stage(self, _stage_upload_panels, job)
+
+@celery_app.task(bind=True, name="pipeline.script", ignore_result=True)
+def script_stage_task(self, job):
+    return _run_stage(self, _stage_script, job)
+
+@celery_app.task(bind=True, name="pipeline.narrate", ignore_result=True)
+def narrate_stage_task(self, job):
+    return _run_stage(self, _stage_narrate, job)
+
+@celery_app.task(bind=True, name="pipeline.assemble")
+def assemble_stage_task(self, job):
+    return _run_stage(self, _stage_assemble, job, final=True)
+
+def enqueue_manga_job(task_id, manga_name, manga_genre, pdf_url, pdf_sha256=None):
+    """Dispatches a job. The task that finishes it carries task_id, so status polls keep working."""
+    if PIPELINE_MODE == "single":
+        return process_manga_pdf_task.apply_async(
+            args=[task_id, manga_name, manga_genre, pdf_url],
+            kwargs={"pdf_sha256": pdf_sha256},
+            task_id=task_id
+        )
+    job = _new_job(task_id, manga_name, manga_genre, pdf_url, pdf_sha256)
+    return chain(
+        extract_stage_task.s(job),
+        upload_panels_stage_task.s(),
+        script_stage_task.s(),
+        narrate_stage_task.s(),
+        assemble_stage_task.s(),
+    ).apply_async(task_id=str(task_id))
+
+# -------------------------------------------------------------------
+# 4. WORKER PROCESS HOOKS (event loop + clients, metrics, artifact sweep)
+# -------------------------------------------------------------------
+async def _create_clients():
+    get_async_supabase()
+    get_async_groq()
+
+@worker_init.connect
+def _init_worker(sender=None, **kwargs):
+    # The persistent loop is per process: threads/gevent/eventlet pools are rejected
+    check_worker_pool(getattr(sender, "pool_cls", None) or celery_app.conf.worker_pool)
+    # Parent process, once per worker: children write to the shared
+    # multiprocess files, only the parent may serve WORKER_METRICS_PORT
+    start_worker_metrics()
+
+@worker_process_init.connect
+def _init_worker_process(**kwargs):
+    # ⚡ One loop per process; pooled clients built now, reused by every task
+    run_on_worker_loop(_create_clients())
+    sweep_stale_artifacts()
+
+@worker_process_shutdown.connect
+def _close_worker_process(pid=None, **kwargs):
+    close_worker_loop()
+    worker_process_exited(pid or os.getpid())
@@ -0,0 +1,206 @@
+"""
+End-to-end pipeline benchmark (offline)
+---------------------------------------
+Usage (from backend/):
+    python -m benchmarks.bench_pipeline                          # grid + strip, 8 pages each
+    python -m benchmarks.bench_pipeline --pages 20 --layouts strip --groq-latency 1.5
+    python -m benchmarks.bench_pipeline --save-baseline          # record this machine's numbers
+    python -m benchmarks.bench_pipeline --check                  # exit 1 on regression
+
+Runs the real _process_task_async on a synthetic PDF against local
+stand-ins (benchmarks/standins.py) with injected latency for storage,
+Groq and Edge-TTS. Per-stage numbers come from the worker's stage spans
+(metrics_utils); each scenario runs in a fresh process for clean peak RSS.
+
+Baselines live in benchmarks/baselines/pipeline.csv (scenario, metric,
+value). --check fails when wall time, peak RSS or any stage that took at
+least --min-seconds in the baseline grows by more than --tolerance.
+Baselines are machine-specific: regenerate them on the CI runner.
+"""
+
+import os
+import sys
+import csv
+import json
+import time
+import logging
+import argparse
+import resource
+import tempfile
+import multiprocessing as mp
+from collections import defaultdict
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baselines", "pipeline.csv")
+
+
+class _StageCollector(logging.Handler):
+    """Aggregates the JSON lines metrics_utils logs on "manhwa.stages"."""
+
+    def __init__(self):
+        super().__init__(logging.INFO)
+        self.stages = defaultdict(lambda: {"calls": 0, "seconds": 0.0, "items": 0, "bytes": 0})
+
+    def emit(self, record):
+        event = json.loads(record.getMessage())
+        stage = self.stages[event["stage"]]
+        stage["calls"] += 1
+        stage["seconds"] += event["seconds"]
+        stage["items"] += event["items"]
+        stage["bytes"] += event["bytes"]
+
+
+def _run_scenario(args, out_queue):
+    import asyncio
+    if not args.verbose:
+        sys.stdout = open(os.devnull, "w")  # the pipeline's own progress prints
+    root = tempfile.mkdtemp(prefix="bench_pipeline_")
+
+    from benchmarks import standins
+    storage, db, groq = standins.install(root, args.groq_latency, args.tts_latency, args.storage_latency)
+
+    from benchmarks.fixtures import make_manga_pdf
+    from app.worker import _process_task_async
+
+    pdf_name = f"{args.layout}_{args.pages}.pdf"
+    make_manga_pdf(os.path.join(root, pdf_name), pages=args.pages, layout=args.layout)
+    pdf_url = f"{standins.serve_directory(root, args.storage_latency)}/{pdf_name}"
+
+    collector = _StageCollector()
+    stage_logger = logging.getLogger("manhwa.stages")
+    stage_logger.addHandler(collector)
+    stage_logger.setLevel(logging.INFO)
+    stage_logger.propagate = False
+
+    start = time.perf_counter()
+    result = asyncio.run(_process_task_async("bench", "Bench Manga", "action", pdf_url))
+    wall = time.perf_counter() - start
+
+    out_queue.put({
+        "result": result,
+        "wall_seconds": wall,
+        # ru_maxrss is KB on Linux; children = detection pool + ffmpeg
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "child_rss_mb": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024,
+        "stages": dict(collector.stages),
+        "groq_calls": groq.calls,
+        "uploads": storage.uploads,
+        "upload_mb": storage.bytes / 1e6,
+    })
+
+
+# -------------------------------------------------------------
+# Baselines
+# -------------------------------------------------------------
+def _scenario_name(args) -> str:
+    return (f"{args.layout}-{args.pages}p-groq{args.groq_latency:g}"
+            f"-tts{args.tts_latency:g}-store{args.storage_latency:g}")
+
+
+def _metrics(r: dict) -> dict:
+    metrics = {"wall_seconds": r["wall_seconds"], "peak_rss_mb": r["peak_rss_mb"]}
+    for stage, s in r["stages"].items():
+        metrics[f"stage:{stage}"] = s["seconds"]
+    return metrics
+
+
+def _load_baseline() -> dict:
+    baseline = defaultdict(dict)
+    if os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH, newline="") as f:
+            for row in csv.DictReader(f):
+                baseline[row["scenario"]][row["metric"]] = float(row["value"])
+    return baseline
+
+
+def _save_baseline(baseline: dict):
+    os.makedirs(os.path.dirname(BASELINE_PATH), exist_ok=True)
+    with open(BASELINE_PATH, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["scenario", "metric", "value"])
+        for scenario in sorted(baseline):
+            for metric, value in sorted(baseline[scenario].items()):
+                writer.writerow([scenario, metric, f"{value:.4f}"])
+
+
+def _check(scenario: str, metrics: dict, baseline: dict, tolerance: float, min_seconds: float) -> list:
+    """Returns a list of regression messages (empty = pass)."""
+    expected = baseline.get(scenario)
+    if not expected:
+        return [f"{scenario}: no baseline (run with --save-baseline)"]
+    failures = []
+    for metric, base in expected.items():
+        if metric.startswith("stage:") and base < min_seconds:
+            continue  # too short to compare reliably
+        value = metrics.get(metric)
+        if value is not None and value > base * (1 + tolerance):
+            failures.append(f"{scenario}: {metric} {value:.2f} > {base:.2f} (+{tolerance:.0%})")
+    return failures
+
+
+# -------------------------------------------------------------
+# Report
+# -------------------------------------------------------------
+def _print_report(scenario: str, r: dict):
+    print(f"\n📊 {scenario} | wall {r['wall_seconds']:.2f}s | peak RSS {r['peak_rss_mb']:.0f} MB "
+          f"(children {r['child_rss_mb']:.0f} MB) | {r['groq_calls']} Groq calls | "
+          f"{r['uploads']} uploads, {r['upload_mb']:.1f} MB")
+    print(f"{'stage':<16}{'calls':>7}{'sec':>9}{'items':>8}{'items/s':>10}{'MB':>9}")
+    for stage, s in sorted(r["stages"].items(), key=lambda kv: -kv[1]["seconds"]):
+        rate = s["items"] / s["seconds"] if s["seconds"] and s["items"] else 0.0
+        print(f"{stage:<16}{s['calls']:>7}{s['seconds']:>9.2f}{s['items']:>8}{rate:>10.1f}{s['bytes'] / 1e6:>9.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=8)
+    parser.add_argument("--layouts", default="grid,strip")
+    parser.add_argument("--groq-latency", type=float, default=0.8, help="seconds per Groq call")
+    parser.add_argument("--tts-latency", type=float, default=0.3, help="seconds to first TTS byte")
+    parser.add_argument("--storage-latency", type=float, default=0.05, help="seconds per upload/download")
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--check", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.30)
+    parser.add_argument("--min-seconds", type=float, default=0.25)
+    parser.add_argument("--verbose", action="store_true", help="show the pipeline's own logs")
+    args = parser.parse_args()
+
+    baseline = _load_baseline()
+    failures = []
+    ctx = mp.get_context("spawn")
+
+    for layout in args.layouts.split(","):
+        args.layout = layout
+        scenario = _scenario_name(args)
+        queue = ctx.Queue()
+        proc = ctx.Process(target=_run_scenario, args=(args, queue))
+        proc.start()
+        proc.join()
+        if proc.exitcode != 0:
+            failures.append(f"{scenario}: ❌ failed (exit {proc.exitcode})")
+            continue
+        r = queue.get()
+        _print_report(scenario, r)
+
+        metrics = _metrics(r)
+        if args.check:
+            failures += _check(scenario, metrics, baseline, args.tolerance, args.min_seconds)
+        if args.save_baseline:
+            baseline[scenario] = metrics
+
+    if args.save_baseline:
+        _save_baseline(baseline)
+        print(f"\n💾 Baseline saved → {BASELINE_PATH}")
+
+    if failures:
+        print("\n❌ Regressions:")
+        for line in failures:
+            print(f"   {line}")
+        sys.exit(1)
+    if args.check:
+        print("\n✅ Within baseline")
+
+
+if __name__ == "__main__":
+    main()
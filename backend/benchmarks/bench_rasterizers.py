@@ -0,0 +1,88 @@
+"""
+Rasterizer benchmark: pages/sec + peak RSS per backend
+------------------------------------------------------
+Usage (from backend/):
+    python -m benchmarks.bench_rasterizers                 # synthetic 20-page PDF
+    python -m benchmarks.bench_rasterizers a.pdf b.pdf --dpi 120 --max-pages 50
+
+Each backend runs in a fresh process so peak RSS numbers don't bleed
+into each other. Poppler renders in a pdftoppm child, so child RSS is
+reported separately.
+"""
+
+import os
+import sys
+import time
+import argparse
+import resource
+import tempfile
+import multiprocessing as mp
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+def _run_backend(name, pdf_paths, dpi, max_pages, out_queue):
+    from app.utils.raster_utils import get_rasterizer
+
+    backend = get_rasterizer(name)
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    pages = 0
+    start = time.perf_counter()
+    for path in pdf_paths:
+        for img in backend.render(path, dpi=dpi, max_pages=max_pages):
+            img.load()
+            pages += 1
+    elapsed = time.perf_counter() - start
+
+    out_queue.put({
+        "backend": backend.name,
+        "pages": pages,
+        "seconds": elapsed,
+        "pages_per_sec": pages / elapsed if elapsed else 0.0,
+        # ru_maxrss is KB on Linux
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "render_rss_mb": (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before) / 1024,
+        "child_rss_mb": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024,
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("pdfs", nargs="*", help="PDF files (default: one synthetic PDF)")
+    parser.add_argument("--dpi", type=int, default=120)
+    parser.add_argument("--max-pages", type=int, default=50)
+    parser.add_argument("--synthetic-pages", type=int, default=20)
+    parser.add_argument("--backends", default=None, help="comma list (default: all available)")
+    args = parser.parse_args()
+
+    from app.utils.raster_utils import available_rasterizers
+
+    pdf_paths = args.pdfs
+    if not pdf_paths:
+        from benchmarks.fixtures import make_manga_pdf
+        tmp = os.path.join(tempfile.gettempdir(), "bench_raster.pdf")
+        pdf_paths = [make_manga_pdf(tmp, pages=args.synthetic_pages)]
+
+    backends = args.backends.split(",") if args.backends else available_rasterizers()
+    ctx = mp.get_context("spawn")
+
+    print(f"📊 {len(pdf_paths)} PDF(s) | dpi={args.dpi} | backends={backends}")
+    print(f"{'backend':<10}{'pages':>7}{'sec':>9}{'pages/s':>10}{'peak MB':>10}{'render MB':>11}{'child MB':>10}")
+    for name in backends:
+        queue = ctx.Queue()
+        proc = ctx.Process(target=_run_backend, args=(name, pdf_paths, args.dpi, args.max_pages, queue))
+        proc.start()
+        proc.join()
+        if proc.exitcode != 0:
+            print(f"{name:<10} ❌ failed (exit {proc.exitcode})")
+            continue
+        r = queue.get()
+        print(
+            f"{r['backend']:<10}{r['pages']:>7}{r['seconds']:>9.2f}{r['pages_per_sec']:>10.1f}"
+            f"{r['peak_rss_mb']:>10.1f}{r['render_rss_mb']:>11.1f}{r['child_rss_mb']:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Panel segmenter benchmark: contour detector vs. gutter projections
+------------------------------------------------------------------
+Usage (from backend/):
+    python -m benchmarks.bench_segmenters                    # synthetic strip + grid pages
+    python -m benchmarks.bench_segmenters --pages 20 --layouts strip
+
+Reports ms/page and how many ground-truth panels each segmenter recovers
+(IoU >= 0.8) on synthetic pages, plus which path "auto" picked.
+"""
+
+import os
+import sys
+import time
+import argparse
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from benchmarks.check_detect_scale import _iou
+
+
+def _recall(truth, boxes, min_iou=0.8) -> int:
+    return sum(any(_iou(t, b) >= min_iou for b in boxes) for t in truth)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=10)
+    parser.add_argument("--layouts", default="strip,grid,strip_clean,grid_wide")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    from benchmarks.fixtures import make_pages
+    from app.utils.pdf_utils import _find_panel_boxes, _segment_by_gutters
+
+    for layout in args.layouts.split(","):
+        pages = make_pages(args.pages, layout)
+        arrays = [np.asarray(img) for img, _ in pages]
+        truth = [boxes for _, boxes in pages]
+        total = sum(len(t) for t in truth)
+
+        print(f"\n📊 layout={layout} | {len(arrays)} pages | {total} ground-truth panels")
+        print(f"{'segmenter':<10}{'ms/page':>10}{'speedup':>9}{'found':>8}{'recall':>9}")
+
+        base_ms = None
+        for segmenter in ("contour", "gutter", "auto"):
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                results = [_find_panel_boxes(arr, 1.0, segmenter) for arr in arrays]
+            ms = (time.perf_counter() - start) * 1000 / (args.repeat * len(arrays))
+            base_ms = base_ms or ms
+            hit = sum(_recall(t, r) for t, r in zip(truth, results))
+            found = sum(len(r) for r in results)
+            print(f"{segmenter:<10}{ms:>10.1f}{base_ms / ms:>8.1f}x{found:>8}{hit / total:>9.0%}")
+
+        confidences = [_segment_by_gutters(arr)[1] for arr in arrays]
+        print(f"gutter confidence: min {min(confidences):.2f} / mean {np.mean(confidences):.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Panel-detection scale check: speed vs. accuracy against ground truth
+--------------------------------------------------------------------
+Usage (from backend/):
+    python -m benchmarks.check_detect_scale                  # synthetic grid_wide + strip_clean fixtures
+    python -m benchmarks.check_detect_scale a.pdf b.pdf --scales 1,0.75,0.5,0.35
+
+Fixture pages are scored against their ground-truth panel boxes: a page
+is "ok" when every true panel is found with IoU >= --min-iou and no extra
+boxes come back. The fixtures are the clean-gutter layouts, where the
+full-resolution detector actually separates the panels — on "grid" /
+"strip" it merges them, which would make any scale look as good as 1.0.
+
+A scale is recommended only from the leading run of scales (1.0 down)
+with exactly the full-resolution accuracy; the first change — a drop,
+or a rise that shows the curve is noisy — ends the search, so a
+non-monotonic curve never recommends a scale past its first wiggle.
+
+PDFs given on the command line have no ground truth: they are compared
+with the scale=1.0 output instead (agreement, not accuracy) and get no
+recommendation.
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+def _iou(a, b) -> float:
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    ix = max(0, min(ax + aw, bx + bw) - max(ax, bx))
+    iy = max(0, min(ay + ah, by + bh) - max(ay, by))
+    inter = ix * iy
+    union = aw * ah + bw * bh - inter
+    return inter / union if union else 0.0
+
+
+def _same_panels(ref, boxes, min_iou: float) -> bool:
+    """Every reference box found (IoU >= min_iou), nothing extra."""
+    if len(ref) != len(boxes):
+        return False
+    return all(any(_iou(a, b) >= min_iou for b in boxes) for a in ref)
+
+
+def _fixture_pages(dpi: int):
+    """(page arrays, ground-truth boxes at `dpi`) for the clean-gutter fixtures."""
+    from app.utils.pdf_utils import _load_pdf_pages
+    from benchmarks.fixtures import make_manga_pdf, make_pages, PAGE_DPI
+
+    tmp = tempfile.gettempdir()
+    arrays, truth = [], []
+    for layout, pages in (("grid_wide", 12), ("strip_clean", 6)):
+        path = make_manga_pdf(os.path.join(tmp, f"check_{layout}.pdf"), pages=pages, layout=layout)
+        arrays.extend(np.asarray(p) for p in _load_pdf_pages(path, dpi=dpi))
+        k = dpi / PAGE_DPI
+        truth.extend(
+            [tuple(round(v * k) for v in box) for box in boxes]
+            for _, boxes in make_pages(pages, layout)
+        )
+    return arrays, truth
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("pdfs", nargs="*", help="PDFs to compare against scale=1.0 (default: scored fixtures)")
+    parser.add_argument("--scales", default="1,0.75,0.5,0.35,0.25")
+    parser.add_argument("--dpi", type=int, default=120)
+    # The contour detector's boxes include its dilation padding (IoU ~0.8 with the true border)
+    parser.add_argument("--min-iou", type=float, default=0.75)
+    parser.add_argument("--repeat", type=int, default=3, help="timing repetitions per page")
+    args = parser.parse_args()
+
+    from app.utils.pdf_utils import _load_pdf_pages, _detect_panel_boxes
+
+    scales = [float(s) for s in args.scales.split(",")]
+    if 1.0 not in scales:
+        scales.insert(0, 1.0)
+
+    if args.pdfs:
+        arrays = []
+        for path in args.pdfs:
+            arrays.extend(np.asarray(p) for p in _load_pdf_pages(path, dpi=args.dpi))
+        reference = [_detect_panel_boxes(arr, 1.0) for arr in arrays]
+        print(f"\n📊 {len(arrays)} pages | agreement with scale=1.0 (no ground truth) | min IoU {args.min_iou}")
+    else:
+        arrays, reference = _fixture_pages(args.dpi)
+        print(f"\n📊 {len(arrays)} fixture pages | accuracy vs ground truth | min IoU {args.min_iou}")
+    print(f"{'scale':>7}{'ms/page':>10}{'speedup':>9}{'pages ok':>10}{'match':>8}")
+
+    base_ms = base_match = None
+    best, searching = 1.0, True
+    for scale in sorted(scales, reverse=True):
+        _detect_panel_boxes(arrays[0], scale)  # warm-up
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            results = [_detect_panel_boxes(arr, scale) for arr in arrays]
+        ms = (time.perf_counter() - start) * 1000 / (args.repeat * len(arrays))
+        base_ms = base_ms or ms
+
+        ok = sum(_same_panels(ref, res, args.min_iou) for ref, res in zip(reference, results))
+        match = ok / len(arrays)
+        base_match = match if base_match is None else base_match
+        if searching and match == base_match:
+            best = scale
+        else:
+            searching = False   # first change (a drop, or a noisy rise) ends the search
+        print(f"{scale:>7.2f}{ms:>10.1f}{base_ms / ms:>8.1f}x{ok:>6}/{len(arrays):<3}{match:>8.0%}")
+
+    if args.pdfs:
+        print("\nℹ No ground truth for these PDFs — agreement only, no recommendation.")
+    elif base_match == 0:
+        print("\n⚠ Full-resolution detection gets no page right — keep PANEL_DETECT_SCALE=1.0.")
+    else:
+        print(f"\n✔ Smallest scale keeping full-res accuracy ({base_match:.0%}): PANEL_DETECT_SCALE={best}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""
+Local stand-ins for the pipeline's external services
+----------------------------------------------------
+ - storage : uploads land in a local directory (file:// URLs); the source
+             PDF is served by a local HTTP server so download_utils runs for real
+ - DB      : `jobs` row updates are recorded, not sent
+ - Groq    : fake AsyncGroq returning well-formed script / description JSON
+ - TTS     : fake edge_tts.Communicate streaming real MP3 frames + WordBoundary
+
+Every stand-in sleeps for a configurable latency so network-bound stages
+keep realistic concurrency behaviour. install() must run before the worker
+module is imported (it sets env defaults read at import time).
+"""
+
+import os
+import re
+import json
+import time
+import uuid
+import shutil
+import asyncio
+import threading
+import subprocess
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+# Read at import time by the app modules. Forced (not defaults) so a local
+# .env can never point a benchmark at real services; "" disables Redis.
+_ENV = {
+    "REDIS_URL": "",
+    "SUPABASE_URL": "http://supabase.invalid",
+    "SUPABASE_SERVICE_ROLE_KEY": "bench",
+    "SUPABASE_BUCKET_NAME": "bench",
+    "GROQ_API_KEY": "bench",
+    "GROQ_RPM": "100000",
+    "GROQ_BURST": "1000",
+    "LLM_CACHE_ENABLED": "false",
+    "RESULT_CACHE_ENABLED": "false",
+    "TTS_SHARED_CACHE": "none",
+    "PUBLISH_SCENE_AUDIO": "true",
+}
+
+_SECOND_OF_MP3 = None  # raw 24 kHz / 48 kbps mono frames, no ID3/Xing header
+
+
+# -------------------------------------------------------------
+# Storage + DB
+# -------------------------------------------------------------
+class LocalStorage:
+    def __init__(self, root: str, latency: float):
+        self.root = root
+        self.latency = latency
+        self.uploads = 0
+        self.bytes = 0
+        self._lock = threading.Lock()
+
+    def _dest(self, file_path: str) -> str:
+        dest = os.path.join(self.root, file_path.lstrip("/"))
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        return dest
+
+    async def upload(self, file_bytes, file_path: str, content_type: str) -> str:
+        await asyncio.sleep(self.latency)
+        dest = self._dest(file_path)
+        if isinstance(file_bytes, str):  # local path → streamed upload
+            shutil.copyfile(file_bytes, dest)
+        else:
+            with open(dest, "wb") as f:
+                f.write(file_bytes)
+        with self._lock:
+            self.uploads += 1
+            self.bytes += os.path.getsize(dest)
+        return f"file://{dest}"
+
+
+class FakeJobsTable:
+    def __init__(self):
+        self.log = []
+
+    async def update(self, task_id, fields: dict):
+        self.log.append((str(task_id), fields))
+
+
+def serve_directory(root: str, latency: float) -> str:
+    """Background HTTP server for the source PDF; returns its base URL."""
+    class _Handler(SimpleHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(latency)
+            super().do_GET()
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), partial(_Handler, directory=root))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_port}"
+
+
+# -------------------------------------------------------------
+# Groq
+# -------------------------------------------------------------
+_PANEL_RANGE = re.compile(r"Narrate panels (\d+) to (\d+)")
+
+
+class _RawResponse:
+    def __init__(self, content: str):
+        body = json.dumps({"choices": [{"message": {"content": content}}]}).encode()
+        self.headers = {"x-ratelimit-remaining-requests": "1000"}
+        self.http_response = type("R", (), {"content": body})()
+        self._content = content
+
+    async def parse(self):
+        message = type("M", (), {"content": self._content})()
+        return type("C", (), {"choices": [type("Ch", (), {"message": message})()]})()
+
+
+class FakeGroq:
+    def __init__(self, latency: float, nonce: str):
+        self.latency = latency
+        self.nonce = nonce  # makes every run's narration unique → no TTS cache hits
+        self.calls = 0
+        self.chat = self
+        self.completions = self
+        self.with_raw_response = self
+
+    def _line(self, i: int) -> str:
+        return (f"Panel {i} mein zabardast action hai, run {self.nonce}. "
+                f"Hero aage badhta hai aur dushman dekhte reh jaate hain!")
+
+    async def create(self, model, messages, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        prompt = messages[0]["content"][0]["text"]
+        match = _PANEL_RANGE.search(prompt)
+        if not match:  # single-panel visual description
+            return _RawResponse(self._line(0))
+        first, last = int(match.group(1)), int(match.group(2))
+        return _RawResponse(json.dumps({
+            "scenes": [{"image_page_index": i, "narration_segment": self._line(i)} for i in range(first, last + 1)],
+            "summary": f"Panels up to {last} narrated.",
+        }))
+
+
+# -------------------------------------------------------------
+# Edge-TTS
+# -------------------------------------------------------------
+def _second_of_mp3() -> bytes:
+    global _SECOND_OF_MP3
+    if _SECOND_OF_MP3 is None:
+        _SECOND_OF_MP3 = subprocess.run(
+            ["ffmpeg", "-hide_banner", "-loglevel", "error", "-f", "lavfi", "-i", "anullsrc=r=24000:cl=mono",
+             "-t", "1", "-c:a", "libmp3lame", "-b:a", "48k", "-write_xing", "0", "-id3v2_version", "0",
+             "-f", "mp3", "pipe:1"],
+            check=True, capture_output=True
+        ).stdout
+    return _SECOND_OF_MP3
+
+
+def fake_communicate(latency: float):
+    """edge_tts.Communicate stand-in: one second of real MP3 frames per 3 words."""
+    second = _second_of_mp3()
+
+    class FakeCommunicate:
+        def __init__(self, text, voice=None, **kwargs):
+            self.words = text.split()
+
+        async def stream(self):
+            await asyncio.sleep(latency)  # time to first byte
+            for i, word in enumerate(self.words):
+                if i % 3 == 0:
+                    yield {"type": "audio", "data": second}
+                yield {"type": "WordBoundary", "offset": i * 4_000_000, "duration": 3_000_000, "text": word}
+
+    return FakeCommunicate
+
+
+# -------------------------------------------------------------
+# Wiring
+# -------------------------------------------------------------
+def install(root: str, groq_latency: float, tts_latency: float, storage_latency: float):
+    """Patches the app modules; returns (storage, db, groq) for reporting."""
+    os.environ.update(_ENV)
+    os.environ["JOB_STORE_PATH"] = os.path.join(root, "jobs.sqlite3")  # never the repo's job_status/
+
+    from app import worker
+    from app.utils import openai_utils, progress_utils, tts_utils
+
+    storage = LocalStorage(os.path.join(root, "storage"), storage_latency)
+    db = FakeJobsTable()
+    groq = FakeGroq(groq_latency, uuid.uuid4().hex[:8])
+
+    worker.supabase_upload_async = storage.upload
+    progress_utils.supabase_upload_async = storage.upload
+    worker.supabase_update_job_async = db.update
+    openai_utils.get_async_groq = lambda: groq
+    tts_utils.edge_tts.Communicate = fake_communicate(tts_latency)
+    return storage, db, groq
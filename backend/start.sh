@@ -1,7 +1,20 @@
 #!/bin/bash
 
-# Start Celery Worker in background (&)
-celery -A app.celery_app worker --loglevel=info --concurrency=1 &
+# Prometheus multiprocess dir shared by the API and both workers: every
+# process writes its samples there and the API's /metrics aggregates them
+export PROMETHEUS_MULTIPROC_DIR=${PROMETHEUS_MULTIPROC_DIR:-/tmp/prometheus_multiproc}
+rm -rf "$PROMETHEUS_MULTIPROC_DIR"
+mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+
+# Start Celery Workers in background (&)
+# CPU stages (rasterize/detect/encode, audio encode) and I/O stages (uploads,
+# Groq, TTS) consume separate queues so each pool can be sized on its own
+# CPU_CONCURRENCY is exported: each CPU child sizes panel detection to its share of the cores
+export CPU_CONCURRENCY=${CPU_CONCURRENCY:-1}
+# Prefork only (-P prefork): each child keeps one event loop (loop_utils);
+# threads/gevent/eventlet pools exit at startup
+celery -A app.celery_app worker --loglevel=info -P prefork -Q pipeline.cpu,celery --concurrency=$CPU_CONCURRENCY -n cpu@%h &
+celery -A app.celery_app worker --loglevel=info -P prefork -Q pipeline.io --concurrency=${IO_CONCURRENCY:-4} -n io@%h &
 
 # Start FastAPI Server in foreground
-uvicorn app.main:app --host 0.0.0.0 --port 7860
\ No newline at end of file
+uvicorn app.main:app --host 0.0.0.0 --port 7860
@@ -0,0 +1,43 @@
+# backend/tests/conftest.py
+"""
+Unit tests run without network or credentials: the env below is set
+before any app module is imported (supabase_utils refuses to import
+without Supabase settings, the caches would otherwise hit disk/Redis).
+"""
+
+import os
+import sys
+import tempfile
+
+os.environ.setdefault("SUPABASE_URL", "http://supabase.invalid")
+os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "test-key")
+os.environ.setdefault("SUPABASE_BUCKET_NAME", "test-bucket")
+os.environ.setdefault("GROQ_API_KEY", "test-key")
+os.environ["REDIS_URL"] = ""
+os.environ["LLM_CACHE_ENABLED"] = "false"
+os.environ["TTS_SHARED_CACHE"] = "none"
+os.environ["JOB_STORE_PATH"] = os.path.join(tempfile.mkdtemp(), "jobs.sqlite3")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from app.utils import tts_cache_utils, job_store_utils
+
+
+@pytest.fixture
+def tts_index(tmp_path, monkeypatch):
+    """Fresh TTS index + clip directory per test."""
+    index = str(tmp_path / "index.sqlite3")
+    monkeypatch.setattr(tts_cache_utils, "TTS_INDEX_PATH", index)
+    with tts_cache_utils.sqlite_connect(index) as conn:
+        conn.executescript(tts_cache_utils._SCHEMA)
+    return tmp_path
+
+
+@pytest.fixture
+def job_store(tmp_path, monkeypatch):
+    """Fresh, empty job store per test."""
+    monkeypatch.setattr(job_store_utils, "JOB_STORE_PATH", str(tmp_path / "jobs.sqlite3"))
+    with job_store_utils._connect() as conn:
+        conn.executescript(job_store_utils._SCHEMA)
+    return job_store_utils
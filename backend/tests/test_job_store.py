@@ -0,0 +1,73 @@
+import asyncio
+from app import worker
+
+
+def _pages(store, limit, status=None):
+    pages, cursor = [], None
+    while True:
+        jobs, cursor = store.list_job_statuses(limit=limit, cursor=cursor, status=status)
+        pages.append([j["job_id"] for j in jobs])
+        if cursor is None:
+            return pages
+
+
+def test_cursor_pages_are_stable_without_gaps_or_duplicates(job_store):
+    # Ties on updated_at are broken by job_id, so a page boundary inside a tie is safe
+    for n in range(23):
+        job_store.write_job_status(f"job{n:02d}", {
+            "job_id": f"job{n:02d}", "status": "SUCCESS" if n % 3 else "FAILED", "_updated_at": 100 + n // 4
+        })
+    expected = [j["job_id"] for j in job_store.list_job_statuses(limit=200)[0]]
+    assert expected == sorted(expected, key=lambda i: (100 + int(i[3:]) // 4, i), reverse=True)
+
+    pages = _pages(job_store, limit=5)
+    assert [len(p) for p in pages] == [5, 5, 5, 5, 3]
+    assert sum(pages, []) == expected
+
+    failed = sum(_pages(job_store, limit=2, status="FAILED"), [])
+    assert failed == [i for i in expected if int(i[3:]) % 3 == 0]
+
+
+def test_newer_jobs_do_not_shift_later_pages(job_store):
+    for n in range(6):
+        job_store.write_job_status(f"job{n}", {"job_id": f"job{n}", "status": "SUCCESS", "_updated_at": n})
+    first, cursor = job_store.list_job_statuses(limit=3)
+    job_store.write_job_status("late", {"job_id": "late", "status": "QUEUED", "_updated_at": 99})
+    rest, cursor = job_store.list_job_statuses(limit=3, cursor=cursor)
+
+    assert [j["job_id"] for j in first + rest] == ["job5", "job4", "job3", "job2", "job1", "job0"]
+    assert cursor is None
+
+
+def test_counts_follow_status_transitions(job_store):
+    for job_id in ("a", "b", "c"):
+        job_store.write_job_status(job_id, {"status": "QUEUED"})
+    job_store.write_job_status("a", {"status": "SUCCESS"})
+    job_store.write_job_status("a", {"status": "SUCCESS", "result_url": "u"})   # same status again
+    job_store.write_job_status("b", {"status": "FAILED"})
+
+    counts = {s: job_store.count_job_statuses(s) for s in ("QUEUED", "SUCCESS", "FAILED")}
+    assert counts == {"QUEUED": 1, "SUCCESS": 1, "FAILED": 1}
+    assert job_store.count_job_statuses() == 3
+
+
+def test_worker_status_updates_reach_the_job_store(job_store, monkeypatch):
+    updates = []
+
+    async def update_job(task_id, fields):
+        updates.append(fields["status"])
+
+    class Progress:
+        async def fail(self, error):
+            pass
+
+    monkeypatch.setattr(worker, "supabase_update_job_async", update_job)
+    job = {"task_id": "7", "manga_name": "Solo"}
+    job_store.write_job_status("7", {"job_id": "7", "status": "QUEUED"})
+
+    asyncio.run(worker._fail_job(job, Progress(), RuntimeError("boom")))
+
+    assert updates == ["FAILED"]
+    assert job_store.read_job_status("7")["status"] == "FAILED"
+    assert job_store.read_job_status("7")["message"] == "boom"
+    assert (job_store.count_job_statuses("QUEUED"), job_store.count_job_statuses("FAILED")) == (0, 1)
@@ -0,0 +1,50 @@
+import os
+import sys
+import socket
+import subprocess
+import textwrap
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# prometheus_client picks multiprocess mode at import time, so the
+# scenario runs in a fresh interpreter with PROMETHEUS_MULTIPROC_DIR set
+SCENARIO = textwrap.dedent("""
+    import os, sys, urllib.request
+    import multiprocessing as mp
+    from app.utils import metrics_utils
+
+    def child():  # a prefork child: records a span, serves nothing
+        with metrics_utils.job_context("job-1"):
+            with metrics_utils.stage_span("detect", items=3):
+                pass
+
+    metrics_utils.start_worker_metrics()   # parent, like worker_init
+    proc = mp.get_context("fork").Process(target=child)
+    proc.start()
+    proc.join()
+    assert proc.exitcode == 0
+
+    body, _ = metrics_utils.metrics_payload()
+    scraped = urllib.request.urlopen(f"http://127.0.0.1:{sys.argv[1]}/metrics").read()
+    for out in (body.decode(), scraped.decode()):
+        assert 'manhwa_stage_seconds_count{stage="detect"} 1.0' in out, out
+        assert 'manhwa_stage_items_total{stage="detect"} 3.0' in out, out
+    print("ok")
+""")
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def test_child_span_reaches_api_and_worker_endpoint(tmp_path):
+    port = _free_port()
+    env = dict(os.environ, PROMETHEUS_MULTIPROC_DIR=str(tmp_path), WORKER_METRICS_PORT=str(port))
+    result = subprocess.run(
+        [sys.executable, "-c", SCENARIO, str(port)],
+        cwd=BACKEND, env=env, capture_output=True, text=True, timeout=60,
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip().endswith("ok")
@@ -0,0 +1,165 @@
+import asyncio
+import httpx
+import pytest
+from groq import AsyncGroq
+from app import worker
+from app.utils import openai_utils, llm_cache_utils
+from app.utils.ratelimit_utils import TokenBucket, parse_reset
+
+
+def _completion(content):
+    return {
+        "id": "chatcmpl-1", "object": "chat.completion", "created": 0, "model": "test",
+        "choices": [{"index": 0, "finish_reason": "stop",
+                     "message": {"role": "assistant", "content": content}}],
+    }
+
+
+@pytest.fixture
+def groq_server(monkeypatch):
+    """
+    Real AsyncGroq over an in-process transport: `responses` is a list of
+    httpx.Response to serve in order, `requests` records what was sent.
+    """
+    state = {"responses": [], "requests": []}
+
+    def handler(request):
+        state["requests"].append(request)
+        return state["responses"].pop(0)
+
+    def client():
+        return AsyncGroq(
+            api_key="test-key", max_retries=0,
+            http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+        )
+
+    monkeypatch.setattr(openai_utils, "get_async_groq", client)
+    monkeypatch.setattr(openai_utils, "groq_limiter", TokenBucket(rate=1000, capacity=10))
+    return state
+
+
+@pytest.fixture
+def llm_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(llm_cache_utils, "LLM_CACHE_PATH", str(tmp_path / "llm.sqlite3"))
+    monkeypatch.setattr(llm_cache_utils, "LLM_CACHE_ENABLED", True)
+    with llm_cache_utils._connect() as conn:
+        conn.executescript(llm_cache_utils._SCHEMA)
+    return llm_cache_utils
+
+
+def test_groq_chat_returns_parsed_content(groq_server):
+    groq_server["responses"].append(httpx.Response(200, json=_completion("Namaste!")))
+    content = asyncio.run(openai_utils.groq_chat([{"type": "text", "text": "hi"}], max_tokens=10))
+    assert content == "Namaste!"
+
+
+def test_groq_chat_retries_after_429(groq_server):
+    groq_server["responses"] += [
+        httpx.Response(429, headers={"retry-after": "0.01"}, json={"error": {"message": "slow down"}}),
+        httpx.Response(200, json=_completion("second try")),
+    ]
+    content = asyncio.run(openai_utils.groq_chat([{"type": "text", "text": "hi"}], max_tokens=10))
+    assert content == "second try"
+    assert len(groq_server["requests"]) == 2
+
+
+def test_groq_chat_gives_up_after_max_retries(groq_server, monkeypatch):
+    monkeypatch.setattr(openai_utils, "GROQ_MAX_RETRIES", 2)
+    groq_server["responses"] += [
+        httpx.Response(429, headers={"retry-after": "0.01"}, json={"error": {"message": "slow down"}})
+        for _ in range(2)
+    ]
+    assert asyncio.run(openai_utils.groq_chat([{"type": "text", "text": "hi"}], max_tokens=10)) is None
+
+
+def test_groq_chat_returns_none_on_error(groq_server):
+    groq_server["responses"].append(httpx.Response(500, json={"error": {"message": "boom"}}))
+    assert asyncio.run(openai_utils.groq_chat([{"type": "text", "text": "hi"}], max_tokens=10)) is None
+
+
+def test_groq_chat_caches_only_validated_content(groq_server, llm_cache):
+    content_list = [{"type": "text", "text": "script please"}]
+    call = lambda: asyncio.run(openai_utils.groq_chat(
+        content_list, max_tokens=10, validate=openai_utils._is_script_json))
+    groq_server["responses"] += [
+        httpx.Response(200, json=_completion('{"scenes": [{"narration_segm')),   # truncated
+        httpx.Response(200, json=_completion('{"scenes": [{"narration_segment": "ok"}]}')),
+    ]
+
+    assert call() == '{"scenes": [{"narration_segm'
+    assert llm_cache.llm_cache_stats()["entries"] == 0
+
+    assert call() == '{"scenes": [{"narration_segment": "ok"}]}'
+    assert call() == '{"scenes": [{"narration_segment": "ok"}]}'   # served from cache
+    assert len(groq_server["requests"]) == 2
+
+
+def test_llm_cache_tracks_bytes_through_replace_and_evict(llm_cache, monkeypatch):
+    llm_cache.llm_cache_put("a", "x" * 100)
+    llm_cache.llm_cache_put("b", "y" * 50)
+    llm_cache.llm_cache_put("a", "x" * 30)   # replace shrinks the total
+    assert llm_cache.llm_cache_stats()["bytes"] == 80
+
+    monkeypatch.setattr(llm_cache, "LLM_CACHE_MAX_BYTES", 100)
+    llm_cache.llm_cache_put("c", "z" * 60)   # 140 > 100 → LRU "b" goes first
+    stats = llm_cache.llm_cache_stats()
+    assert llm_cache.llm_cache_get("b") is None
+    with llm_cache._connect() as conn:
+        actual = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+    assert stats["bytes"] == actual <= 90
+
+
+def test_visual_description_is_real_content(groq_server):
+    groq_server["responses"].append(httpx.Response(200, json=_completion("  Hero ka entry!  ")))
+    assert asyncio.run(worker.generate_visual_description_async(b"\xff\xd8jpeg")) == "Hero ka entry!"
+
+
+def test_visual_description_falls_back_on_failure(groq_server):
+    groq_server["responses"].append(httpx.Response(500, json={"error": {"message": "boom"}}))
+    assert asyncio.run(worker.generate_visual_description_async(b"\xff\xd8jpeg")) == "Scene aage badhta hai..."
+
+
+def test_llm_cache_key_hashes_images():
+    a = openai_utils.image_content(b"panel-a")
+    b = openai_utils.image_content(b"panel-b")
+    key = lambda content, **kw: openai_utils.llm_cache_key("m", "3", content, max_tokens=10, **kw)
+
+    assert key([a]) == key([openai_utils.image_content(b"panel-a")])
+    assert key([a]) != key([b])
+    assert key([a]) != key([a], temperature=0.1)
+    assert key([a]) != openai_utils.llm_cache_key("m", "4", [a], max_tokens=10)
+
+
+def test_parse_reset_formats():
+    assert parse_reset("2m59.56s") == pytest.approx(179.56)
+    assert parse_reset("120ms") == pytest.approx(0.12)
+    assert parse_reset("3") == 3.0
+    assert parse_reset(None) == 0.0
+
+
+def test_token_bucket_burst_then_rate():
+    async def run():
+        bucket = TokenBucket(rate=50, capacity=3)
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        for _ in range(3):
+            await bucket.acquire()
+        burst = loop.time() - start
+        await bucket.acquire()   # bucket empty → waits ~1/rate
+        return burst, loop.time() - start
+
+    burst, total = asyncio.run(run())
+    assert burst < 0.01
+    assert total >= 0.015
+
+
+def test_token_bucket_follows_headers():
+    bucket = TokenBucket(rate=1, capacity=10)
+    bucket.update_from_headers({"x-ratelimit-remaining-requests": "2"})
+    assert bucket.tokens == 2
+
+    bucket.update_from_headers({"x-ratelimit-remaining-tokens": "0", "x-ratelimit-reset-tokens": "5s"})
+    assert bucket.tokens == 0
+    assert bucket.blocked_until > 0
+
+    assert bucket.backoff(1, {"retry-after": "7"}) == 7.0
@@ -0,0 +1,61 @@
+import asyncio
+import pytest
+from fastapi.testclient import TestClient
+from app import worker, main
+from app.utils import cache_utils
+
+
+def test_settings_cover_output_settings():
+    settings = worker._result_cache_settings("  Action ")
+    assert settings["genre"] == "action"
+    assert {k: settings[k] for k in worker.OUTPUT_SETTINGS} == worker.OUTPUT_SETTINGS
+
+
+@pytest.mark.parametrize("name, value", [
+    ("dedup_distance", 99),
+    ("jpeg_quality", 1),
+    ("script_batch_size", 1),
+    ("tts_rate", "+50%"),
+    ("tts_sentence_mode", "changed"),
+    ("audio_bitrate", "8k"),
+])
+def test_output_setting_changes_key(monkeypatch, name, value):
+    before = cache_utils._settings_hash(worker._result_cache_settings("action"))
+    monkeypatch.setitem(worker.OUTPUT_SETTINGS, name, value)
+    assert cache_utils._settings_hash(worker._result_cache_settings("action")) != before
+
+
+def test_lookup_checks_result_off_the_loop(monkeypatch):
+    cached = {"result_url": "https://storage/result.json"}
+    dropped, counted = [], []
+    monkeypatch.setattr(worker, "get_cached_result", lambda sha, settings: cached)
+    monkeypatch.setattr(worker, "drop_cached_result", lambda sha, settings: dropped.append(sha))
+    monkeypatch.setattr(worker, "count_result_lookup", lambda hit: counted.append(hit))
+
+    class Resp:
+        def __init__(self, status_code):
+            self.status_code = status_code
+
+    monkeypatch.setattr(worker.http_session, "head", lambda url, timeout: Resp(200))
+    assert asyncio.run(worker._lookup_cached_result("abc", {})) is cached
+
+    monkeypatch.setattr(worker.http_session, "head", lambda url, timeout: Resp(404))
+    assert asyncio.run(worker._lookup_cached_result("abc", {})) is None
+    assert dropped == ["abc"]
+    assert counted == [True, False]   # the dead entry counts as a miss
+
+
+def test_cache_endpoints_need_admin_token(monkeypatch):
+    monkeypatch.setattr(main, "invalidate_result_cache", lambda sha: 0)
+    client = TestClient(main.app)
+
+    monkeypatch.setattr(main, "ADMIN_TOKEN", "")
+    assert client.post("/api/v1/cache/invalidate").status_code == 503
+
+    monkeypatch.setattr(main, "ADMIN_TOKEN", "s3cret")
+    assert client.post("/api/v1/cache/invalidate").status_code == 401
+    assert client.post("/api/v1/cache/invalidate", headers={"X-Admin-Token": "nope"}).status_code == 401
+    resp = client.post("/api/v1/cache/invalidate", headers={"X-Admin-Token": "s3cret"})
+    assert resp.status_code == 200
+    assert resp.json() == {"invalidated": "all", "result": 0}
+    assert client.get("/api/v1/cache/stats").status_code == 401
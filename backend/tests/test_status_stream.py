@@ -0,0 +1,74 @@
+import asyncio
+import json
+from fastapi.testclient import TestClient
+from app import main
+from app.utils import events_utils, status_utils
+
+
+class FakePubSub:
+    """Redis pubsub stand-in: serves `messages` in order, then silence."""
+    def __init__(self, messages):
+        self.messages = list(messages)
+        self.closed = False
+
+    async def subscribe(self, channel):
+        pass
+
+    async def get_message(self, ignore_subscribe_messages, timeout):
+        if self.messages:
+            return {"data": json.dumps(self.messages.pop(0))}
+        await asyncio.sleep(timeout)
+        return None
+
+    async def aclose(self):
+        self.closed = True
+
+
+class FakeRedis:
+    def __init__(self, messages=(), state=None):
+        self.pubsub_obj = FakePubSub(messages)
+        self.state = state
+
+    def pubsub(self):
+        return self.pubsub_obj
+
+    async def get(self, key):
+        return json.dumps(self.state) if self.state else None
+
+
+def _unknown_job(monkeypatch):
+    async def no_state(task_id):
+        return None
+
+    async def pending(task_id):
+        return {"status": "PENDING", "result": None}
+
+    async def no_row(task_id):
+        return None
+
+    monkeypatch.setattr(main, "events_redis", object())
+    monkeypatch.setattr(main, "aget_job_state", no_state)
+    monkeypatch.setattr(status_utils, "aget_job_state", no_state)
+    monkeypatch.setattr(status_utils, "_celery_meta", pending)
+    monkeypatch.setattr(status_utils, "_job_row", no_row)
+
+
+def test_stream_404s_for_unknown_job(monkeypatch):
+    _unknown_job(monkeypatch)
+    resp = TestClient(main.app).get("/api/v1/status/12345/stream")
+    assert resp.status_code == 404
+
+
+def test_stream_closes_after_max_idle(monkeypatch):
+    fake = FakeRedis(messages=[{"state": "PROCESSING", "stage": "tts"}])
+    monkeypatch.setattr(events_utils, "get_async_redis", lambda: fake)
+    monkeypatch.setattr(events_utils, "STREAM_HEARTBEAT", 0.01)
+    monkeypatch.setattr(events_utils, "STREAM_MAX_IDLE", 0.05)
+
+    async def collect():
+        return [e async for e in events_utils.subscribe_job_events("1", {"state": "PROCESSING"})]
+
+    events = asyncio.run(asyncio.wait_for(collect(), timeout=2))
+    assert events[:2] == [{"state": "PROCESSING"}, {"state": "PROCESSING", "stage": "tts"}]
+    assert set(events[2:]) == {None}   # heartbeats until the idle limit
+    assert fake.pubsub_obj.closed
@@ -0,0 +1,30 @@
+from app.utils import supabase_utils
+
+
+class FakeBucket:
+    def __init__(self, fail_first=0):
+        self.fail_first = fail_first
+        self.files = []
+
+    def upload(self, path, file, file_options):
+        self.files.append(file)
+        file.read()
+        if len(self.files) <= self.fail_first:
+            raise ConnectionError("Server disconnected")
+
+    def get_public_url(self, path):
+        return f"https://storage/{path}"
+
+
+def test_upload_file_closes_handle_every_attempt(tmp_path, monkeypatch):
+    bucket = FakeBucket(fail_first=1)
+    monkeypatch.setattr(supabase_utils.supabase.storage, "from_", lambda name: bucket)
+    monkeypatch.setattr(supabase_utils.time, "sleep", lambda s: None)
+    src = tmp_path / "chapter.pdf"
+    src.write_bytes(b"%PDF")
+
+    url = supabase_utils.supabase_upload_file(src, "uploads/chapter.pdf", "application/pdf")
+
+    assert url == "https://storage/uploads/chapter.pdf"
+    assert len(bucket.files) == 2
+    assert all(f.closed for f in bucket.files)
@@ -0,0 +1,81 @@
+import os
+import time
+import asyncio
+from app.utils import tts_cache_utils, tts_utils
+
+
+def _clip(path, size=100):
+    path.write_bytes(b"\xff" * size)
+    return str(path)
+
+
+def test_local_index_hits_and_misses(tts_index):
+    path = _clip(tts_index / "a.mp3")
+    assert tts_cache_utils.tts_cache_lookup("a") is None
+    tts_cache_utils.tts_cache_store("a", path, 1.5, "voice")
+    assert tts_cache_utils.tts_cache_lookup("a") == (path, 1.5)
+
+    stats = tts_cache_utils.tts_cache_stats()
+    assert (stats["hits"], stats["misses"], stats["clips"]) == (1, 1, 1)
+
+
+def test_local_index_drops_vanished_files(tts_index):
+    path = _clip(tts_index / "a.mp3")
+    tts_cache_utils.tts_cache_store("a", path, 1.5, "voice")
+    (tts_index / "a.mp3").unlink()
+    assert tts_cache_utils.tts_cache_lookup("a") is None
+    assert tts_cache_utils.tts_cache_stats()["clips"] == 0
+
+
+def test_local_index_evicts_least_recently_used(tts_index, monkeypatch):
+    monkeypatch.setattr(tts_cache_utils, "TTS_CACHE_MAX_BYTES", 250)
+    for key in ("old", "mid", "new"):
+        tts_cache_utils.tts_cache_store(key, _clip(tts_index / f"{key}.mp3"), 1.0, "voice")
+
+    assert tts_cache_utils.tts_cache_lookup("old") is None
+    assert not (tts_index / "old.mp3").exists()
+    assert tts_cache_utils.tts_cache_lookup("new") is not None
+
+
+def test_startup_sweep_removes_old_unindexed_files(tts_index):
+    tts_cache_utils.tts_cache_store("kept", _clip(tts_index / "kept.mp3"), 1.0, "voice")
+    old = [
+        _clip(tts_index / "0cc175b9c0f1b6a831c399e269772661.mp3"),   # legacy md5 name
+        _clip(tts_index / "abc_fallback.mp3"),
+        _clip(tts_index / "abc.mp3.1234.part"),
+        _clip(tts_index / "silence_1000ms_24000.mp3.5678.part.mp3"),
+        _clip(tts_index / "kept.mp3"),
+        _clip(tts_index / "silence_1000ms_24000.mp3"),
+    ]
+    _clip(tts_index / "def.mp3.9999.part")   # a synthesis still in flight
+    stale = time.time() - 7200
+    for path in old:
+        os.utime(path, (stale, stale))
+
+    assert tts_cache_utils._sweep_orphans(max_age=3600) == 4
+    assert sorted(p.name for p in tts_index.iterdir() if "sqlite3" not in p.name) == [
+        "def.mp3.9999.part", "kept.mp3", "silence_1000ms_24000.mp3",
+    ]
+    assert tts_cache_utils.tts_cache_lookup("kept") is not None
+
+
+def test_shared_dir_tier_fills_local_index(tts_index, monkeypatch):
+    store = tts_cache_utils.DirTTSStore(str(tts_index / "shared"))
+    monkeypatch.setattr(tts_utils, "shared_store", store)
+    monkeypatch.setattr(tts_utils, "_duration", lambda path: 2.0)
+
+    src = _clip(tts_index / "src.mp3")
+    asyncio.run(tts_utils._publish_shared("k", src))
+    final = str(tts_index / "k.mp3")
+
+    assert asyncio.run(tts_utils._fetch_shared("k", final)) == (final, 2.0)
+    assert tts_cache_utils.tts_cache_lookup("k") == (final, 2.0)
+    assert tts_cache_utils.tts_cache_stats()["shared_hits"] == 1
+    assert asyncio.run(tts_utils._fetch_shared("missing", str(tts_index / "m.mp3"))) is None
+
+
+def test_tts_key_depends_on_voice_and_rate():
+    base = tts_utils.tts_cache_key("namaste")
+    assert tts_utils.tts_cache_key("namaste") == base
+    assert tts_utils.tts_cache_key("namaste", voice="en-US-ChristopherNeural") != base
+    assert tts_utils.tts_cache_key("namaste", rate="+20%") != base
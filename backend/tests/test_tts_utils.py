@@ -0,0 +1,105 @@
+import asyncio
+from app.utils import tts_utils
+
+
+class FakeCommunicate:
+    """Edge-TTS stand-in: the text as 'audio', tracks open sessions."""
+    open_sessions = 0
+    max_sessions = 0
+
+    def __init__(self, text, voice, rate=None, boundary=None):
+        self.text = text
+
+    async def stream(self):
+        cls = FakeCommunicate
+        cls.open_sessions += 1
+        cls.max_sessions = max(cls.max_sessions, cls.open_sessions)
+        try:
+            await asyncio.sleep(0.01)
+            yield {"type": "audio", "data": self.text.encode()}
+            yield {"type": "WordBoundary", "offset": 0, "duration": 10_000_000}
+        finally:
+            cls.open_sessions -= 1
+
+
+def test_split_sentences_merges_short_fragments(monkeypatch):
+    monkeypatch.setattr(tts_utils, "TTS_MIN_SENTENCE_CHARS", 10)
+    text = "Hi. Yeh ek lambi line hai! Aur yeh doosri line hai। Ok."
+    assert tts_utils.split_sentences(text) == [
+        "Hi. Yeh ek lambi line hai!",
+        "Aur yeh doosri line hai। Ok.",
+    ]
+
+
+def test_sentences_concatenate_in_order(tmp_path, monkeypatch):
+    monkeypatch.setattr(tts_utils, "TTS_MIN_SENTENCE_CHARS", 1)
+    monkeypatch.setattr(tts_utils.edge_tts, "Communicate", FakeCommunicate)
+    out = tmp_path / "clip.mp3"
+
+    dur = asyncio.run(tts_utils._synthesize_sentences(
+        "One. Two! Three?", str(out), asyncio.Semaphore(2)
+    ))
+
+    assert out.read_bytes() == b"One.Two!Three?"
+    assert dur == 3.0  # one second of word boundaries per sentence
+    assert list(tmp_path.iterdir()) == [out]  # parts cleaned up
+
+
+def test_batch_caps_sessions_per_sentence(tts_index, monkeypatch):
+    monkeypatch.setattr(tts_utils, "TTS_CACHE_DIR", str(tts_index))
+    monkeypatch.setattr(tts_utils, "TTS_MIN_SENTENCE_CHARS", 1)
+    monkeypatch.setattr(tts_utils, "TTS_CONCURRENCY", 3)
+    monkeypatch.setattr(tts_utils, "_assert_ffmpeg_exists", lambda: None)
+    monkeypatch.setattr(tts_utils.edge_tts, "Communicate", FakeCommunicate)
+    FakeCommunicate.max_sessions = 0
+
+    texts = [f"Scene {i} a. Scene {i} b. Scene {i} c." for i in range(5)]
+    results = asyncio.run(tts_utils.generate_narration_batch(texts + texts[:1]))
+
+    assert FakeCommunicate.max_sessions == 3
+    assert [d for _, d in results] == [1.0] * 6  # more scenes than sessions → one session per scene
+    assert results[5] == results[0]  # identical lines synthesized once
+
+
+def test_batch_splits_scenes_while_sessions_are_free(tts_index, monkeypatch):
+    monkeypatch.setattr(tts_utils, "TTS_CACHE_DIR", str(tts_index))
+    monkeypatch.setattr(tts_utils, "TTS_MIN_SENTENCE_CHARS", 1)
+    monkeypatch.setattr(tts_utils, "TTS_CONCURRENCY", 4)
+    monkeypatch.setattr(tts_utils, "_assert_ffmpeg_exists", lambda: None)
+    monkeypatch.setattr(tts_utils.edge_tts, "Communicate", FakeCommunicate)
+    FakeCommunicate.max_sessions = 0
+
+    results = asyncio.run(tts_utils.generate_narration_batch(["A. B. C. D. E.", "F. G. H."]))
+
+    assert FakeCommunicate.max_sessions == 4
+    assert [d for _, d in results] == [2.0, 2.0]  # 4 sessions // 2 scenes = 2 parts each
+
+
+def test_group_sentences_keeps_order_and_balances_length():
+    sentences = ["aaaa.", "b.", "c.", "dddd.", "e."]
+    assert tts_utils._group_sentences(sentences, 2) == ["aaaa. b. c.", "dddd. e."]
+    assert tts_utils._group_sentences(sentences, 9) == sentences
+    assert tts_utils._group_sentences(sentences, 1) == ["aaaa. b. c. dddd. e."]
+
+
+def test_failed_synthesis_falls_back_to_24k_mono_silence(tts_index, monkeypatch):
+    import subprocess
+    from app.utils import audio_utils
+
+    class BrokenCommunicate(FakeCommunicate):
+        async def stream(self):
+            raise ConnectionError("edge-tts down")
+            yield
+
+    monkeypatch.setattr(tts_utils, "TTS_CACHE_DIR", str(tts_index))
+    monkeypatch.setattr(audio_utils, "TTS_CACHE_DIR", str(tts_index))
+    monkeypatch.setattr(tts_utils, "TTS_MAX_RETRIES", 1)
+    monkeypatch.setattr(tts_utils, "_fetch_shared", lambda *a: asyncio.sleep(0))
+    monkeypatch.setattr(tts_utils.edge_tts, "Communicate", BrokenCommunicate)
+
+    path, dur = asyncio.run(tts_utils.generate_narration_audio("Koi nahi sunega."))
+
+    info = subprocess.run(["ffmpeg", "-hide_banner", "-i", path], capture_output=True, text=True).stderr
+    assert dur == 1.0
+    assert "24000 Hz, mono" in info
+    assert not list(tts_index.glob("*_fallback.mp3"))
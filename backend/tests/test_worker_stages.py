@@ -0,0 +1,96 @@
+import asyncio
+import threading
+import pytest
+from app import worker
+from app.utils import loop_utils
+
+
+class FakeProgress:
+    def __init__(self, calls):
+        self.calls = calls
+
+    async def stage(self, name):
+        pass
+
+    async def complete(self, result):
+        self.calls.append("complete")
+
+
+def _job(tmp_path):
+    scenes = tmp_path / "scenes.json"
+    scenes.write_text('[{"narration_segment": "a", "image_page_index": 0}]')
+    return {
+        "task_id": "1", "manga_name": "m", "manga_genre": "action", "pdf_sha256": "abc",
+        "manga_folder": "m_1", "cached": False, "image_urls": ["u0"],
+        "scenes": str(scenes), "clips": [["", 0.0]],
+    }
+
+
+def _patch_persistence(monkeypatch, tmp_path, calls, fail_db=False):
+    async def assemble(track):
+        path = tmp_path / "narration.mp3"
+        path.write_bytes(b"mp3")
+        return str(path)
+
+    async def upload(data, path, content_type):
+        calls.append(f"upload {path}")
+        return f"https://storage/{path}"
+
+    async def update_job(task_id, fields):
+        calls.append("db")
+        if fail_db:
+            raise RuntimeError("db down")
+
+    monkeypatch.setattr(worker, "assemble_narration", assemble)
+    monkeypatch.setattr(worker, "supabase_upload_async", upload)
+    monkeypatch.setattr(worker, "supabase_update_job_async", update_job)
+    monkeypatch.setattr(worker, "store_cached_result", lambda *a: calls.append("cache"))
+
+
+def test_success_published_after_persistence(tmp_path, monkeypatch):
+    calls = []
+    _patch_persistence(monkeypatch, tmp_path, calls)
+    asyncio.run(worker._stage_assemble(_job(tmp_path), FakeProgress(calls)))
+    assert calls[-3:] == ["cache", "db", "complete"]
+
+
+def test_no_success_when_db_update_fails(tmp_path, monkeypatch):
+    calls = []
+    _patch_persistence(monkeypatch, tmp_path, calls, fail_db=True)
+    with pytest.raises(RuntimeError):
+        asyncio.run(worker._stage_assemble(_job(tmp_path), FakeProgress(calls)))
+    assert "complete" not in calls
+
+
+def test_extract_runs_off_the_event_loop(tmp_path, monkeypatch):
+    pdf = tmp_path / "in.pdf"
+    pdf.write_bytes(b"%PDF")
+    threads = []
+
+    async def no_cache(sha, settings):
+        return None
+
+    def extract(path, dpi):
+        threads.append(threading.current_thread())
+        return []
+
+    monkeypatch.setattr(worker, "download_pdf", lambda url, sha: (str(pdf), "abc"))
+    monkeypatch.setattr(worker, "_lookup_cached_result", no_cache)
+    monkeypatch.setattr(worker, "extract_pdf_images_high_quality", extract)
+    job = worker._new_job("1", "m", "action", "https://storage/in.pdf")
+
+    with pytest.raises(ValueError, match="No images"):
+        asyncio.run(worker._stage_extract(job, FakeProgress([])))
+    assert threads and threads[0] is not threading.main_thread()
+
+
+@pytest.mark.parametrize("pool", ["threads", "gevent", "eventlet"])
+def test_worker_refuses_thread_and_green_pools(pool):
+    with pytest.raises(SystemExit, match="prefork"):
+        loop_utils.check_worker_pool(pool)
+
+
+def test_worker_accepts_process_pools():
+    from celery.concurrency.solo import TaskPool
+    for pool in ("prefork", "processes", "solo", TaskPool):
+        loop_utils.check_worker_pool(pool)